@@ -41,10 +41,7 @@ class PostAdmin(admin.ModelAdmin):
         "category",
         "location",
     )
-
-    @admin.display(description="Комментариев")
-    def comment_count(self, post):
-        return post.comments.count()
+    list_select_related = ("author", "category", "location")
 
 
 admin.site.register(Comment)
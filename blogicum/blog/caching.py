@@ -0,0 +1,49 @@
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.http import quote_etag
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from .middleware import record_cache
+from .versions import REFS_SCOPE, get_versions, post_scope
+
+PAGE_KEY = 'blog:page:{}:{}:{}'
+CARD_KEY = 'blog:card:{}:{}-{}'
+CARD_TEMPLATE = 'includes/post_card.html'
+
+
+def page_cache_key(request, versions, tick=''):
+    path = md5(request.get_full_path().encode()).hexdigest()
+    return PAGE_KEY.format(path, tick, '-'.join(map(str, versions)))
+
+
+def page_etag(request, versions, tick=''):
+    return quote_etag(md5(
+        f'{request.user.id}:{tick}:{"-".join(map(str, versions))}'.encode()
+    ).hexdigest())
+
+
+def render_post_cards(posts):
+    posts = list(posts)
+    if not posts:
+        return
+    refs_version, *post_versions = get_versions(
+        REFS_SCOPE, *(post_scope(post.id) for post in posts)
+    )
+    keys = [
+        CARD_KEY.format(post.id, refs_version, post_version)
+        for post, post_version in zip(posts, post_versions)
+    ]
+    cards = cache.get_many(keys)
+    record_cache(hits=len(cards), misses=len(keys) - len(cards))
+    rendered = {}
+    for post, key in zip(posts, keys):
+        if key not in cards:
+            rendered[key] = cards[key] = render_to_string(
+                CARD_TEMPLATE, {'post': post}
+            )
+        post.rendered_card = mark_safe(cards[key])
+    if rendered:
+        cache.set_many(rendered, settings.POST_CARD_CACHE_TIMEOUT)
@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS
+from django.core.checks import Error, Tags, register
+
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+)
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """Версии, страницы и карточки в кеше должны быть общими для всех
+    процессов сервера, иначе изменения видны только одному из них."""
+    backend = settings.CACHES.get(DEFAULT_CACHE_ALIAS, {}).get('BACKEND')
+    if settings.DEBUG or backend not in PROCESS_LOCAL_CACHES:
+        return []
+    return [Error(
+        f'Кеш {backend} хранится в памяти одного процесса: остальные '
+        'процессы сервера не увидят новых версий публикаций и будут '
+        'отдавать устаревшие страницы.',
+        hint='Укажите общий кеш, например PyMemcacheCache, в CACHES.',
+        obj=DEFAULT_CACHE_ALIAS,
+        id='blog.E001',
+    )]
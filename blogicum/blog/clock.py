@@ -0,0 +1,17 @@
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.utils import timezone
+
+
+def visibility_tick(now=None):
+    now = now or timezone.now()
+    bucket = settings.VISIBILITY_CLOCK_BUCKET
+    return int(now.timestamp()) // bucket
+
+
+def visibility_now(now=None):
+    return datetime.fromtimestamp(
+        visibility_tick(now) * settings.VISIBILITY_CLOCK_BUCKET,
+        tz=dt_timezone.utc,
+    )
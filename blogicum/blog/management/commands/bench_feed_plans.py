@@ -0,0 +1,95 @@
+import re
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from blog.models import Category, Comment, Post, User
+from blog.views import POSTS_PER_PAGE, get_posts
+
+FULL_SCAN_PATTERNS = (
+    re.compile(r'\bSCAN (TABLE )?blog_post\b(?! USING)'),
+    re.compile(r'Seq Scan on blog_post\b'),
+    re.compile(r'\bALL\b.*\bblog_post\b'),
+)
+
+
+def get_feed_queries():
+    queries = {'index': get_posts()}
+    author = User.objects.filter(posts__isnull=False).first()
+    if author is not None:
+        queries['profile'] = get_posts(author.posts.all())
+        queries['profile (author)'] = get_posts(
+            author.posts.all(), filter_by_is_published=False
+        )
+    category = Category.objects.filter(is_published=True).first()
+    if category is not None:
+        queries['category'] = get_posts(category.posts.all())
+    post = Post.objects.filter(comment_count__gt=0).first()
+    if post is not None:
+        queries['comments'] = Comment.objects.filter(post=post).order_by(
+            'created_at', 'id'
+        )
+    return {
+        name: queryset[:POSTS_PER_PAGE]
+        for name, queryset in queries.items()
+    }
+
+
+def get_query_shape(queryset):
+    compiler = queryset.query.get_compiler(queryset.db)
+    sql, params = compiler.as_sql()
+    return len(compiler.get_select()[0]), sql.count(' JOIN ')
+
+
+def is_full_scan(plan):
+    return any(pattern.search(plan) for pattern in FULL_SCAN_PATTERNS)
+
+
+class Command(BaseCommand):
+    help = (
+        'Показывает планы запросов ленты и время их выполнения, '
+        'чтобы проверить использование индексов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Сколько раз выполнить каждый запрос для замера времени.',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f'Публикаций: {Post.objects.count()}, '
+            f'база данных: {connection.vendor}'
+        )
+        full_scans = 0
+        for name, queryset in get_feed_queries().items():
+            plan = queryset.explain()
+            timings = []
+            for _ in range(options['repeat']):
+                started = perf_counter()
+                list(queryset.all())
+                timings.append(perf_counter() - started)
+            best = min(timings) * 1000 if timings else 0
+            columns, joins = get_query_shape(queryset)
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f'\n{name}: {best:.2f} мс, столбцов: {columns}, '
+                f'соединений: {joins}'
+            ))
+            self.stdout.write(plan)
+            if is_full_scan(plan):
+                full_scans += 1
+                self.stdout.write(self.style.WARNING(
+                    'Полный просмотр таблицы blog_post.'
+                ))
+        if full_scans:
+            self.stdout.write(self.style.ERROR(
+                f'\nЗапросов без индекса: {full_scans}'
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                '\nВсе запросы ленты используют индексы.'
+            ))
@@ -0,0 +1,70 @@
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from blog.views import POSTS_PER_PAGE, get_posts
+
+
+def get_full_rows(queryset):
+    return queryset.defer(None).select_related('location', 'category')
+
+
+def measure_transfer(queryset):
+    sql, params = queryset.query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+    return sum(
+        len(value) if isinstance(value, bytes) else len(str(value).encode())
+        for row in rows
+        for value in row
+        if value is not None
+    )
+
+
+def measure_allocations(queryset):
+    queryset = queryset.all()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    posts = list(queryset)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    stats = after.compare_to(before, 'filename')
+    del posts
+    return (
+        sum(stat.count_diff for stat in stats),
+        sum(stat.size_diff for stat in stats),
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает объём данных и число объектов Python на страницу ленты '
+        'для полной выборки и узкой проекции get_posts.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--per-page',
+            type=int,
+            nargs='+',
+            default=[POSTS_PER_PAGE, 100],
+            help='Размеры страниц для замера.',
+        )
+
+    def handle(self, *args, **options):
+        feed = get_posts()
+        variants = {'полная выборка': get_full_rows(feed), 'проекция': feed}
+        for per_page in options['per_page']:
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f'Публикаций на странице: {per_page}'
+            ))
+            for name, queryset in variants.items():
+                page = queryset[:per_page]
+                transferred = measure_transfer(page)
+                blocks, size = measure_allocations(page)
+                self.stdout.write(
+                    f'  {name:>15}: {transferred} байт из БД, '
+                    f'{blocks} объектов, {size} байт памяти'
+                )
@@ -0,0 +1,345 @@
+import json
+import logging
+import platform
+import random
+import resource
+import secrets
+import subprocess
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.urls import reverse
+
+from blog.models import Category, User
+from blog.views import get_posts
+from blog.wsgi_client import WSGIClient, default_host
+
+ENDPOINTS = ('index', 'category', 'profile', 'detail', 'comment', 'login')
+DEFAULT_MIX = 'index=40,category=15,profile=15,detail=20,comment=5,login=5'
+BENCH_USERNAME_PREFIX = 'bench_http_'
+
+
+def parse_mix(mix):
+    weights = {}
+    for item in mix.split(','):
+        name, _, weight = item.partition('=')
+        if name not in ENDPOINTS or not weight.isdigit():
+            raise CommandError(
+                f'Неверный элемент смеси запросов «{item}»; ожидается '
+                f'имя=вес, имена: {", ".join(ENDPOINTS)}.'
+            )
+        weights[name] = int(weight)
+    return weights
+
+
+def percentile(values, share):
+    return values[min(int(len(values) * share), len(values) - 1)]
+
+
+def current_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def peak_rss_kb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+class Visitor:
+    """Запросы смеси: по методу на каждое имя из ENDPOINTS."""
+
+    def __init__(self, application, host, targets, rng, credentials):
+        self.reader = WSGIClient(application, host)
+        self.commenter = WSGIClient(application, host)
+        self.commenter.login(*credentials)
+        self.application = application
+        self.host = host
+        self.targets = targets
+        self.rng = rng
+        self.credentials = credentials
+
+    def get(self, name, target):
+        return self.reader.request('GET', reverse(
+            name, args=[self.rng.choice(self.targets[target])]
+        ))
+
+    def index(self):
+        return self.reader.request('GET', reverse('blog:index'))
+
+    def category(self):
+        return self.get('blog:category_posts', 'category')
+
+    def profile(self):
+        return self.get('blog:profile', 'profile')
+
+    def detail(self):
+        return self.get('blog:post_detail', 'post')
+
+    def comment(self):
+        post_id = self.rng.choice(self.targets['post'])
+        return self.commenter.request(
+            'POST',
+            reverse('blog:add_comment', args=[post_id]),
+            {'text': 'Комментарий нагрузочного теста'},
+            csrf=True,
+        )
+
+    def login(self):
+        return WSGIClient(self.application, self.host).login(
+            *self.credentials
+        )
+
+
+def new_stats():
+    return {
+        'latencies': [], 'queries': 0, 'statuses': Counter(), 'rss_growth': 0,
+    }
+
+
+def run_worker(task):
+    """Отправляет запросы одного процесса; журнал blog.timing на время
+    замера отключается, чтобы не мерить запись в него."""
+    timing_logger = logging.getLogger('blog.timing')
+    level = timing_logger.level
+    timing_logger.setLevel(logging.WARNING)
+    try:
+        return measure(*task)
+    finally:
+        timing_logger.setLevel(level)
+
+
+def measure(seed, mix, targets, requests, warmup, host, credentials):
+    from blogicum.wsgi import application
+
+    rng = random.Random(seed)
+    visitor = Visitor(application, host, targets, rng, credentials)
+    names = rng.choices(list(mix), list(mix.values()), k=warmup + requests)
+    for name in names[:warmup]:
+        getattr(visitor, name)()
+    queries = 0
+
+    def count_query(execute, sql, params, many, context):
+        nonlocal queries
+        queries += 1
+        return execute(sql, params, many, context)
+
+    stats = defaultdict(new_stats)
+    started = perf_counter()
+    with connection.execute_wrapper(count_query):
+        for name in names[warmup:]:
+            rss_before, queries = peak_rss_kb(), 0
+            request_started = perf_counter()
+            try:
+                status = getattr(visitor, name)()
+            except Exception as error:
+                status = type(error).__name__
+            endpoint = stats[name]
+            endpoint['latencies'].append(perf_counter() - request_started)
+            endpoint['queries'] += queries
+            endpoint['statuses'][status] += 1
+            endpoint['rss_growth'] += peak_rss_kb() - rss_before
+    return {
+        'elapsed': perf_counter() - started,
+        'peak_rss_kb': peak_rss_kb(),
+        'endpoints': dict(stats),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочный замер: вызывает WSGI-приложение в этом процессе или '
+        'в нескольких процессах со смесью запросов к ленте, категориям, '
+        'профилям, публикациям, комментариям и входу; выводит задержки '
+        'p50/p95/p99, RPS, запросы к БД и пиковую память в JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Число процессов; при 1 запросы идут в этом процессе.',
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=1000,
+            help='Сколько запросов отправляет каждый процесс.',
+        )
+        parser.add_argument(
+            '--warmup',
+            type=int,
+            default=50,
+            help='Сколько запросов отправить до начала замера.',
+        )
+        parser.add_argument(
+            '--mix',
+            default=DEFAULT_MIX,
+            help=f'Веса запросов, например «{DEFAULT_MIX}».',
+        )
+        parser.add_argument(
+            '--host',
+            default=None,
+            help='Заголовок Host; по умолчанию первый из ALLOWED_HOSTS.',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--allow-writes',
+            action='store_true',
+            help=(
+                'Разрешить замер при выключенном DEBUG: смесь создаёт '
+                'пользователя и комментарии, которые после замера '
+                'удаляются.'
+            ),
+        )
+        parser.add_argument(
+            '--output',
+            default=None,
+            help='Файл для отчёта вместо стандартного вывода.',
+        )
+
+    def handle(self, *args, **options):
+        mix = parse_mix(options['mix'])
+        if not settings.DEBUG and not options['allow_writes']:
+            raise CommandError(
+                'Замер пишет в базу: создаёт пользователя и комментарии. '
+                'Запускайте его с DEBUG или укажите --allow-writes.'
+            )
+        if settings.DEBUG:
+            self.stderr.write(
+                'DEBUG включён: запросы к БД журналируются, результаты '
+                'будут хуже, чем в рабочем окружении.'
+            )
+        host = options['host'] or default_host()
+        targets = self.get_targets()
+        user, password = self.create_user()
+        try:
+            results = self.run(
+                mix, targets, host, (user.username, password), options
+            )
+        finally:
+            # Удаляется только созданный здесь пользователь; его
+            # комментарии удаляются каскадно, а сигналы поправят
+            # счётчики и сбросят версии.
+            user.delete()
+        report = json.dumps(
+            self.build_report(results, options), ensure_ascii=False, indent=2
+        )
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                output.write(report)
+        else:
+            self.stdout.write(report)
+
+    def run(self, mix, targets, host, credentials, options):
+        tasks = [
+            (
+                options['seed'] + worker,
+                mix,
+                targets,
+                options['requests'],
+                options['warmup'],
+                host,
+                credentials,
+            )
+            for worker in range(options['workers'])
+        ]
+        if options['workers'] == 1:
+            return [run_worker(tasks[0])]
+        connections.close_all()
+        with ProcessPoolExecutor(
+            options['workers'], initializer=django.setup
+        ) as pool:
+            return list(pool.map(run_worker, tasks))
+
+    def get_targets(self):
+        posts = list(get_posts().values_list('id', 'author__username')[:1000])
+        categories = list(
+            Category.objects.filter(is_published=True).values_list(
+                'slug', flat=True
+            )[:100]
+        )
+        if not posts or not categories:
+            raise CommandError(
+                'Нет опубликованных публикаций или категорий; заполните базу, '
+                'например командой generate_load_data.'
+            )
+        return {
+            'post': [post_id for post_id, _ in posts],
+            'profile': sorted({username for _, username in posts}),
+            'category': categories,
+        }
+
+    def create_user(self):
+        """Новый пользователь со случайным именем: существующую учётную
+        запись замер не трогает."""
+        password = secrets.token_urlsafe()
+        user = User.objects.create_user(
+            f'{BENCH_USERNAME_PREFIX}{secrets.token_hex(4)}',
+            password=password,
+        )
+        return user, password
+
+    def build_report(self, results, options):
+        merged = defaultdict(new_stats)
+        for result in results:
+            for name, endpoint in result['endpoints'].items():
+                merged[name]['latencies'] += endpoint['latencies']
+                merged[name]['queries'] += endpoint['queries']
+                merged[name]['statuses'].update(endpoint['statuses'])
+                merged[name]['rss_growth'] += endpoint['rss_growth']
+        total = sum(len(endpoint['latencies']) for endpoint in merged.values())
+        rps = sum(
+            sum(len(endpoint['latencies'])
+                for endpoint in result['endpoints'].values())
+            / result['elapsed']
+            for result in results
+        )
+        endpoints = {}
+        for name in ENDPOINTS:
+            if name not in merged:
+                continue
+            endpoint = merged[name]
+            latencies = sorted(endpoint['latencies'])
+            endpoints[name] = {
+                'requests': len(latencies),
+                'share': round(len(latencies) / total, 3),
+                'rps': round(rps * len(latencies) / total, 1),
+                'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+                'p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+                'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+                'queries_per_request': round(
+                    endpoint['queries'] / len(latencies), 2
+                ),
+                'rss_growth_kb': endpoint['rss_growth'],
+                'statuses': {
+                    str(status): count
+                    for status, count in endpoint['statuses'].items()
+                },
+            }
+        return {
+            'commit': current_commit(),
+            'workers': options['workers'],
+            'requests_per_worker': options['requests'],
+            'mix': options['mix'],
+            'database': connection.vendor,
+            'debug': settings.DEBUG,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'rps': round(rps, 1),
+            'peak_rss_kb': max(result['peak_rss_kb'] for result in results),
+            'endpoints': endpoints,
+        }
@@ -0,0 +1,78 @@
+import tracemalloc
+from collections import Counter
+from io import StringIO
+from time import perf_counter
+
+from django.apps import apps
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.core.management.color import no_style
+from django.db import connection, transaction
+
+from blog.management.commands.fast_loaddata import (
+    JSONArrayReader, open_fixture
+)
+
+LOADERS = ('loaddata', 'fast_loaddata')
+
+
+def count_objects(path):
+    with open_fixture(path) as stream:
+        return Counter(item['model'] for item in JSONArrayReader(stream))
+
+
+def measure(command, path, tables, trace):
+    """Загружает фикстуру в пустые таблицы и откатывает транзакцию,
+    чтобы следующий замер начинался с той же базы."""
+    with transaction.atomic():
+        connection.ops.execute_sql_flush(
+            connection.ops.sql_flush(no_style(), tables, allow_cascade=True)
+        )
+        if trace:
+            tracemalloc.start()
+        try:
+            started = perf_counter()
+            call_command(command, path, verbosity=0, stdout=StringIO())
+            elapsed = perf_counter() - started
+            peak = tracemalloc.get_traced_memory()[1] if trace else None
+        finally:
+            if trace:
+                tracemalloc.stop()
+            transaction.set_rollback(True)
+    return elapsed, peak
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает время и пиковую память loaddata и fast_loaddata на '
+        'одной фикстуре; база после замера не меняется.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('fixture', help='Путь к файлу фикстуры.')
+        parser.add_argument(
+            '--loaders',
+            nargs='+',
+            choices=LOADERS,
+            default=LOADERS,
+            help='Какие команды загрузки сравнивать.',
+        )
+
+    def handle(self, *args, **options):
+        path = options['fixture']
+        counts = count_objects(path)
+        tables = [
+            apps.get_model(label)._meta.db_table for label in counts
+        ]
+        objects = sum(counts.values())
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f'Объектов в фикстуре: {objects}, моделей: {len(counts)}'
+        ))
+        for command in options['loaders']:
+            elapsed, _ = measure(command, path, tables, trace=False)
+            _, peak = measure(command, path, tables, trace=True)
+            self.stdout.write(
+                f'  {command:>13}: {elapsed:.2f} с, '
+                f'{objects / elapsed:.0f} объектов в секунду, '
+                f'пик памяти Python {peak / 2 ** 20:.1f} МиБ'
+            )
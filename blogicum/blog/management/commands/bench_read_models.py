@@ -0,0 +1,78 @@
+import tracemalloc
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+from django.template.loader import render_to_string
+
+from blog.caching import CARD_TEMPLATE
+from blog.read_models import load_post_cards
+from blog.references import reference_cache
+from blog.views import get_posts
+
+
+def load_models(posts, references):
+    posts = list(posts)
+    references.attach(posts)
+    return posts
+
+
+def measure(load, posts, references, repeat):
+    load_timings, render_timings = [], []
+    for _ in range(repeat):
+        started = perf_counter()
+        page = load(posts.all(), references)
+        loaded = perf_counter()
+        for post in page:
+            render_to_string(CARD_TEMPLATE, {'post': post})
+        load_timings.append(loaded - started)
+        render_timings.append(perf_counter() - loaded)
+    tracemalloc.start()
+    page = load(posts.all(), references)
+    memory, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del page
+    return min(load_timings), min(render_timings), memory
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает время и память при загрузке и отрисовке страницы ленты '
+        'из моделей ORM и из облегчённых моделей чтения.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--per-page',
+            type=int,
+            nargs='+',
+            default=[10, 100, 1000],
+            help='Размеры страниц для замера.',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Сколько раз повторить каждый замер времени.',
+        )
+
+    def handle(self, *args, **options):
+        references = reference_cache.get()
+        variants = {
+            'модели ORM': load_models,
+            'модели чтения': load_post_cards,
+        }
+        for per_page in options['per_page']:
+            posts = get_posts()[:per_page]
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f'Публикаций на странице: {per_page} '
+                f'(найдено {len(posts)})'
+            ))
+            for name, load in variants.items():
+                load_time, render_time, memory = measure(
+                    load, posts, references, options['repeat']
+                )
+                self.stdout.write(
+                    f'  {name:>13}: загрузка {load_time * 1000:.2f} мс, '
+                    f'отрисовка {render_time * 1000:.2f} мс, '
+                    f'{memory} байт памяти на страницу'
+                )
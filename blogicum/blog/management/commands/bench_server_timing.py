@@ -0,0 +1,92 @@
+import logging
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.http import HttpResponse
+from django.template import engines
+from django.template.response import SimpleTemplateResponse
+from django.test import RequestFactory
+
+from blog.middleware import ServerTimingMiddleware, logger, record_cache
+
+TEMPLATE = engines['django'].from_string('{{ value }}')
+
+
+def make_view(queries):
+    def view(request):
+        with connection.cursor() as cursor:
+            for _ in range(queries):
+                cursor.execute('SELECT 1')
+                cursor.fetchone()
+        record_cache(hits=1)
+        return SimpleTemplateResponse(TEMPLATE, {'value': 'ok'})
+    return view
+
+
+def make_handler(view, timed):
+    """Повторяет порядок вызовов BaseHandler для ответа с шаблоном."""
+    def get_response(request):
+        response = view(request)
+        if timed:
+            response = middleware.process_template_response(
+                request, response
+            )
+        return response.render()
+
+    middleware = ServerTimingMiddleware(get_response)
+    return middleware if timed else get_response
+
+
+def measure(handler, request, repeat, rounds=5):
+    timings = []
+    for _ in range(rounds):
+        started = perf_counter()
+        for _ in range(repeat):
+            response = handler(request)
+        timings.append((perf_counter() - started) / repeat)
+    assert isinstance(response, HttpResponse)
+    return min(timings)
+
+
+class Command(BaseCommand):
+    help = (
+        'Измеряет накладные расходы ServerTimingMiddleware на один запрос '
+        'по сравнению с тем же обработчиком без неё.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=10000,
+            help='Сколько запросов выполнить в каждом из пяти замеров.',
+        )
+        parser.add_argument(
+            '--queries',
+            type=int,
+            nargs='+',
+            default=[0, 5, 20],
+            help='Сколько запросов к БД делает обработчик.',
+        )
+
+    def handle(self, *args, **options):
+        request = RequestFactory().get('/')
+        handlers = logger.handlers
+        logger.handlers = [logging.NullHandler()]
+        try:
+            for queries in options['queries']:
+                view = make_view(queries)
+                plain = make_handler(view, timed=False)
+                timed = make_handler(view, timed=True)
+                measure(timed, request, options['repeat'] // 10, rounds=1)
+                base = measure(plain, request, options['repeat'])
+                with_timing = measure(timed, request, options['repeat'])
+                self.stdout.write(
+                    f'Запросов к БД: {queries:>3}: '
+                    f'без middleware {base * 1e6:.1f} мкс, '
+                    f'с middleware {with_timing * 1e6:.1f} мкс, '
+                    f'накладные расходы {(with_timing - base) * 1e6:.1f} мкс'
+                )
+        finally:
+            logger.handlers = handlers
@@ -0,0 +1,330 @@
+import bz2
+import gzip
+import json
+import lzma
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from time import perf_counter
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.core.serializers import base, python
+from django.db import (
+    DEFAULT_DB_ALIAS, connections, reset_queries, router, transaction
+)
+from django.utils import timezone
+
+from blog.management.commands.rebuild_comment_counts import (
+    rebuild_comment_counts
+)
+from blog.models import Comment, Post
+from blog.versions import FEED_SCOPE, REFS_SCOPE, bump_versions
+
+BATCH_SIZE = 500
+CHUNK_SIZE = 64 * 1024
+WHITESPACE = ' \t\n\r'
+NUMBER_CHARS = '0123456789.eE+-'
+OPENERS = {
+    '.gz': gzip.open,
+    '.bz2': bz2.open,
+    '.xz': lzma.open,
+    '.lzma': lzma.open,
+}
+
+
+def open_fixture(path):
+    for suffix, opener in OPENERS.items():
+        if path.endswith(suffix):
+            return opener(path, 'rt', encoding='utf-8')
+    return open(path, encoding='utf-8')
+
+
+class JSONArrayReader:
+    """Отдаёт элементы JSON-массива по одному; в памяти держится только
+    непрочитанный остаток фрагмента файла и текущий элемент."""
+
+    def __init__(self, stream, chunk_size=CHUNK_SIZE):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.position = 0
+
+    def __iter__(self):
+        self.expect('[')
+        if self.peek() == ']':
+            return
+        while True:
+            yield self.decode()
+            if self.expect(',]') == ']':
+                return
+
+    def read(self):
+        chunk = self.stream.read(self.chunk_size)
+        if not chunk:
+            return False
+        self.buffer = self.buffer[self.position:] + chunk
+        self.position = 0
+        return True
+
+    def peek(self):
+        while True:
+            while (
+                self.position < len(self.buffer)
+                and self.buffer[self.position] in WHITESPACE
+            ):
+                self.position += 1
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if not self.read():
+                raise CommandError('Файл закончился раньше, чем массив.')
+
+    def expect(self, chars):
+        char = self.peek()
+        if char not in chars:
+            raise CommandError(
+                f'Ожидался символ «{chars}», а не «{char}»; фикстура '
+                'должна быть JSON-массивом.'
+            )
+        self.position += 1
+        return char
+
+    def decode(self):
+        self.peek()
+        while True:
+            try:
+                item, end = self.decoder.raw_decode(self.buffer, self.position)
+            except json.JSONDecodeError as error:
+                if not self.read():
+                    raise CommandError(f'Неверный JSON в фикстуре: {error}')
+                continue
+            # Число на границе фрагмента могло оборваться: дочитываем.
+            if (
+                end < len(self.buffer)
+                and self.buffer[end] not in NUMBER_CHARS
+                or not self.read()
+            ):
+                self.position = end
+                return item
+
+
+def timestamp_fields():
+    return [
+        field
+        for model in apps.get_models()
+        for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False)
+        or getattr(field, 'auto_now_add', False)
+    ]
+
+
+@contextmanager
+def raw_timestamps(fields):
+    """Сохраняет даты из фикстуры, как loaddata, вместо текущего времени,
+    которое подставляют auto_now и auto_now_add."""
+    saved = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, saved):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Loader:
+    """Копит объекты фикстуры по моделям и сохраняет их пачками."""
+
+    def __init__(self, using, batch_size, timestamps):
+        self.using = using
+        self.batch_size = batch_size
+        self.timestamps = set(timestamps)
+        self.now = timezone.now()
+        self.pending = defaultdict(list)
+        self.deferred = []
+        self.loaded = Counter()
+        self.tables = set()
+
+    def add(self, deserialized):
+        model = type(deserialized.object)
+        if not router.allow_migrate_model(self.using, model):
+            return
+        if deserialized.deferred_fields:
+            self.deferred.append(deserialized)
+        batch = self.pending[model]
+        batch.append(deserialized)
+        if len(batch) >= self.batch_size:
+            self.flush(model, batch)
+
+    def finish(self):
+        for model, batch in self.pending.items():
+            self.flush(model, batch)
+        for deserialized in self.deferred:
+            deserialized.save_deferred_fields(using=self.using)
+
+    def fill_timestamps(self, obj):
+        """Подставляет время загрузки в даты auto_now и auto_now_add,
+        которых нет в фикстуре."""
+        for field in obj._meta.concrete_fields:
+            if getattr(obj, field.attname) is None and (
+                field in self.timestamps
+            ):
+                setattr(obj, field.attname, self.now)
+
+    def pre_save(self, obj, add):
+        """Вызывает pre_save полей, как save(): bulk_update и сохранение
+        raw этого не делают."""
+        for field in obj._meta.concrete_fields:
+            if not field.primary_key:
+                setattr(obj, field.attname, field.pre_save(obj, add))
+
+    def flush(self, model, batch):
+        if not batch:
+            return
+        manager = model._base_manager.using(self.using)
+        objects = [deserialized.object for deserialized in batch]
+        existing = set(manager.filter(
+            pk__in=[obj.pk for obj in objects if obj.pk is not None]
+        ).values_list('pk', flat=True))
+        created, updated, bulk = [], [], []
+        for deserialized in batch:
+            obj = deserialized.object
+            self.fill_timestamps(obj)
+            if isinstance(obj, Post):
+                # Без save() и сигналов HTML текста сам не появится.
+                obj.render_text()
+            if obj.pk is None:
+                # Без pk нельзя связать объект с его m2m после bulk_create.
+                self.pre_save(obj, add=True)
+                deserialized.save(using=self.using)
+                continue
+            if obj.pk in existing:
+                self.pre_save(obj, add=False)
+                updated.append(obj)
+            else:
+                created.append(obj)
+            bulk.append(deserialized)
+        manager.bulk_create(created, batch_size=self.batch_size)
+        manager.bulk_update(
+            updated,
+            [
+                field.name for field in model._meta.concrete_fields
+                if not field.primary_key
+            ],
+            batch_size=self.batch_size,
+        )
+        self.flush_m2m(model, bulk, existing)
+        self.loaded[model] += len(batch)
+        self.tables.add(model._meta.db_table)
+        batch.clear()
+        reset_queries()
+
+    def flush_m2m(self, model, batch, existing):
+        rows = defaultdict(list)
+        for deserialized in batch:
+            obj = deserialized.object
+            for name, values in (deserialized.m2m_data or {}).items():
+                if values == base.DEFER_FIELD:
+                    continue
+                field = model._meta.get_field(name)
+                through = field.remote_field.through
+                source = through._meta.get_field(field.m2m_field_name())
+                target = through._meta.get_field(
+                    field.m2m_reverse_field_name()
+                )
+                if obj.pk in existing:
+                    through._base_manager.using(self.using).filter(
+                        **{source.attname: obj.pk}
+                    ).delete()
+                rows[through] += [
+                    through(**{source.attname: obj.pk, target.attname: value})
+                    for value in values
+                ]
+        for through, objects in rows.items():
+            through._base_manager.using(self.using).bulk_create(
+                objects, batch_size=self.batch_size
+            )
+            self.tables.add(through._meta.db_table)
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает фикстуры JSON, как loaddata, но читает файл потоком и '
+        'сохраняет объекты пачками через bulk_create без сигналов; '
+        'проверка внешних ключей и пересчёт счётчиков выполняются в конце.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'fixtures',
+            nargs='+',
+            help='Пути к файлам JSON, в том числе сжатым gz, bz2 и xz.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='Сколько объектов одной модели сохранять за раз.',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=CHUNK_SIZE,
+            help='Сколько символов файла читать за раз.',
+        )
+        parser.add_argument(
+            '--database',
+            default=DEFAULT_DB_ALIAS,
+            help='База данных для загрузки.',
+        )
+        parser.add_argument(
+            '-i',
+            '--ignorenonexistent',
+            action='store_true',
+            help='Пропускать модели и поля, которых нет в проекте.',
+        )
+
+    def handle(self, *args, **options):
+        started = perf_counter()
+        using = options['database']
+        connection = connections[using]
+        loader = Loader(using, options['batch_size'], timestamp_fields())
+        with transaction.atomic(using=using):
+            with connection.constraint_checks_disabled():
+                with raw_timestamps(loader.timestamps):
+                    for path in options['fixtures']:
+                        self.load(path, loader, options)
+                    loader.finish()
+            models = list(loader.loaded)
+            connection.check_constraints(table_names=sorted(loader.tables))
+            sequence_sql = connection.ops.sequence_reset_sql(
+                no_style(), models
+            )
+            with connection.cursor() as cursor:
+                for sql in sequence_sql:
+                    cursor.execute(sql)
+            if Post in loader.loaded or Comment in loader.loaded:
+                rebuild_comment_counts(
+                    Post.objects.using(using), Comment.objects.using(using)
+                )
+        if models:
+            bump_versions(FEED_SCOPE, REFS_SCOPE)
+        elapsed = perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено объектов: {sum(loader.loaded.values())} из файлов: '
+            f'{len(options["fixtures"])} за {elapsed:.1f} с'
+        ))
+
+    def load(self, path, loader, options):
+        try:
+            with open_fixture(path) as stream:
+                for deserialized in python.Deserializer(
+                    JSONArrayReader(stream, options['chunk_size']),
+                    using=loader.using,
+                    ignorenonexistent=options['ignorenonexistent'],
+                    handle_forward_references=True,
+                ):
+                    loader.add(deserialized)
+        except (OSError, base.DeserializationError) as error:
+            raise CommandError(f'Не удалось загрузить «{path}»: {error}')
@@ -0,0 +1,305 @@
+import random
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import timedelta
+from time import perf_counter
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.core.management.color import no_style
+from django.db import connection, connections, reset_queries, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from blog.models import Category, Comment, Location, Post, User
+from blog.text import render_excerpt, render_text_html
+from blog.versions import FEED_SCOPE, REFS_SCOPE, bump_versions
+
+WORDS = (
+    'утро город море река лес дорога дом окно свет ветер снег дождь '
+    'солнце небо поезд вокзал кофе книга письмо друг встреча музей '
+    'парк мост улица площадь горы озеро берег закат рассвет прогулка '
+    'путешествие история фотография музыка вечер ночь тишина праздник '
+    'рынок сад поле тропа маяк остров карта компас палатка костёр'
+).split()
+VISIBLE, SCHEDULED, UNPUBLISHED = 'v', 's', 'u'
+COMMENT_AGE = timedelta(days=30)
+SCHEDULE_AHEAD = timedelta(days=7)
+
+
+def words(rng, low, high):
+    return ' '.join(rng.choices(WORDS, k=rng.randint(low, high)))
+
+
+def phrases(rng, low, high, number=1000):
+    """Заранее собранные фразы: выбрать готовую быстрее, чем собирать
+    новую для каждого из миллионов комментариев."""
+    return [words(rng, low, high).capitalize() for _ in range(number)]
+
+
+def next_id(model):
+    return (model.objects.aggregate(Max('id'))['id__max'] or 0) + 1
+
+
+def distribute_comments(rng, kinds, total, alpha):
+    """Раскладывает комментарии по видимым публикациям по закону
+    Парето: немногие публикации собирают большую часть обсуждения."""
+    weights = [
+        rng.paretovariate(alpha) if kind == VISIBLE else 0.0
+        for kind in kinds
+    ]
+    scale = total / (sum(weights) or 1)
+    counts = [int(weight * scale) for weight in weights]
+    visible = [index for index, kind in enumerate(kinds) if kind == VISIBLE]
+    if visible:
+        for index in rng.choices(visible, k=total - sum(counts)):
+            counts[index] += 1
+    return counts
+
+
+@contextmanager
+def manual_timestamps():
+    """Позволяет задать created_at при bulk_create вместо
+    текущего времени, которое подставляют auto_now и auto_now_add."""
+    fields = [
+        Post._meta.get_field('created_at'),
+        Comment._meta.get_field('created_at'),
+    ]
+    saved = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, saved):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def create_chunk(task):
+    """Создаёт публикации с заранее известными id и их комментарии;
+    выполняется в основном процессе или в процессе пула."""
+    (seed, first_post_id, first_comment_id, kinds, counts, user_ids,
+     category_ids, location_ids, now, skew_days, batch_size) = task
+    rng = random.Random(seed)
+    titles = phrases(rng, 2, 6)
+    # bulk_create не вызывает save(), поэтому HTML готовится здесь,
+    # один раз на фразу.
+    texts = [
+        (text, render_text_html(text), render_excerpt(text))
+        for text in phrases(rng, 5, 30)
+    ]
+    comment_texts = phrases(rng, 3, 20)
+    posts, comments = [], []
+    comment_id = first_comment_id
+    for offset, (kind, comment_count) in enumerate(zip(kinds, counts)):
+        if kind == SCHEDULED:
+            pub_date = now + SCHEDULE_AHEAD * rng.random()
+        else:
+            pub_date = now - timedelta(days=skew_days) * rng.random() ** 3
+        created_at = min(pub_date, now)
+        post_id = first_post_id + offset
+        comment_dates = sorted(
+            created_at + min(now - created_at, COMMENT_AGE) * rng.random()
+            for _ in range(comment_count)
+        )
+        title = rng.choice(titles)
+        text, text_html, excerpt = rng.choice(texts)
+        posts.append(Post(
+            id=post_id,
+            title=title,
+            text=text,
+            text_html=text_html,
+            excerpt=excerpt,
+            pub_date=pub_date,
+            created_at=created_at,
+            is_published=kind != UNPUBLISHED,
+            comment_count=comment_count,
+            author_id=rng.choice(user_ids),
+            category_id=rng.choice(category_ids),
+            location_id=rng.choice(location_ids) if rng.random() < 0.7
+            else None,
+        ))
+        for comment_date in comment_dates:
+            comments.append(Comment(
+                id=comment_id,
+                text=rng.choice(comment_texts),
+                post_id=post_id,
+                author_id=rng.choice(user_ids),
+                created_at=comment_date,
+            ))
+            comment_id += 1
+    with manual_timestamps(), transaction.atomic():
+        Post.objects.bulk_create(posts, batch_size=batch_size)
+        Comment.objects.bulk_create(comments, batch_size=batch_size)
+    reset_queries()
+    return len(posts), len(comments)
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт пользователей, категории, местоположения, публикации и '
+        'комментарии в объёмах, близких к рабочим, для нагрузочных замеров.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--categories', type=int, default=20)
+        parser.add_argument('--locations', type=int, default=50)
+        parser.add_argument('--posts', type=int, default=100_000)
+        parser.add_argument('--comments', type=int, default=1_000_000)
+        parser.add_argument(
+            '--scheduled',
+            type=float,
+            default=0.01,
+            help='Доля отложенных публикаций (pub_date в будущем).',
+        )
+        parser.add_argument(
+            '--unpublished',
+            type=float,
+            default=0.02,
+            help='Доля снятых с публикации.',
+        )
+        parser.add_argument(
+            '--skew-days',
+            type=int,
+            default=3 * 365,
+            help=(
+                'За сколько дней распределены даты публикаций; новых '
+                'публикаций больше, чем старых.'
+            ),
+        )
+        parser.add_argument(
+            '--comment-alpha',
+            type=float,
+            default=1.2,
+            help='Показатель распределения Парето числа комментариев.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Сколько публикаций создавать за одну задачу.',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help=(
+                'Число процессов для создания публикаций и комментариев; '
+                'SQLite не допускает параллельной записи.'
+            ),
+        )
+        parser.add_argument('--seed', type=int, default=None)
+
+    def handle(self, *args, **options):
+        started = perf_counter()
+        rng = random.Random(options['seed'])
+        now = timezone.now()
+        user_ids = self.create_users(options['users'])
+        category_ids = self.create_categories(options['categories'], rng)
+        location_ids = self.create_locations(options['locations'], rng)
+        kinds = rng.choices(
+            (SCHEDULED, UNPUBLISHED, VISIBLE),
+            weights=(
+                options['scheduled'],
+                options['unpublished'],
+                max(1 - options['scheduled'] - options['unpublished'], 0),
+            ),
+            k=options['posts'],
+        )
+        counts = distribute_comments(
+            rng, kinds, options['comments'], options['comment_alpha']
+        )
+        batch_size = options['batch_size']
+        first_post_id, first_comment_id = next_id(Post), next_id(Comment)
+        tasks = []
+        for start in range(0, options['posts'], batch_size):
+            tasks.append((
+                rng.getrandbits(64),
+                first_post_id + start,
+                first_comment_id,
+                ''.join(kinds[start:start + batch_size]),
+                counts[start:start + batch_size],
+                user_ids,
+                category_ids,
+                location_ids,
+                now,
+                options['skew_days'],
+                batch_size,
+            ))
+            first_comment_id += sum(counts[start:start + batch_size])
+        posts = comments = 0
+        for created_posts, created_comments in self.run(
+            tasks, options['workers']
+        ):
+            posts += created_posts
+            comments += created_comments
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(
+                no_style(), [User, Category, Location, Post, Comment]
+            ):
+                cursor.execute(sql)
+        bump_versions(FEED_SCOPE, REFS_SCOPE)
+        elapsed = perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано: пользователей {len(user_ids)}, категорий '
+            f'{len(category_ids)}, местоположений {len(location_ids)}, '
+            f'публикаций {posts}, комментариев {comments} '
+            f'за {elapsed:.1f} с ({(posts + comments) / elapsed:.0f} '
+            f'строк в секунду)'
+        ))
+
+    def run(self, tasks, workers):
+        if workers > 1 and connection.vendor == 'sqlite':
+            self.stderr.write(
+                'SQLite не допускает параллельной записи, '
+                'данные создаются в одном процессе.'
+            )
+            workers = 1
+        if workers <= 1:
+            yield from map(create_chunk, tasks)
+            return
+        connections.close_all()
+        with ProcessPoolExecutor(workers, initializer=django.setup) as pool:
+            yield from pool.map(create_chunk, tasks)
+
+    def create_users(self, number):
+        first_id = next_id(User)
+        password = make_password(None)
+        ids = list(range(first_id, first_id + number))
+        User.objects.bulk_create(
+            (
+                User(
+                    id=user_id,
+                    username=f'load_user_{user_id}',
+                    password=password,
+                )
+                for user_id in ids
+            ),
+            batch_size=5000,
+        )
+        return ids
+
+    def create_categories(self, number, rng):
+        first_id = next_id(Category)
+        ids = list(range(first_id, first_id + number))
+        Category.objects.bulk_create(
+            Category(
+                id=category_id,
+                title=words(rng, 1, 3).capitalize(),
+                description=words(rng, 5, 15).capitalize(),
+                slug=f'load-category-{category_id}',
+            )
+            for category_id in ids
+        )
+        return ids
+
+    def create_locations(self, number, rng):
+        first_id = next_id(Location)
+        ids = list(range(first_id, first_id + number))
+        Location.objects.bulk_create(
+            Location(id=location_id, name=words(rng, 1, 2).capitalize())
+            for location_id in ids
+        )
+        return ids
@@ -0,0 +1,186 @@
+import heapq
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+from django.utils import timezone
+
+from blog.checks import PROCESS_LOCAL_CACHES
+from blog.clock import visibility_now
+from blog.models import Post
+from blog.versions import (
+    FEED_SCOPE,
+    author_scope,
+    bump_versions,
+    category_scope,
+    post_scope,
+)
+from blog.wsgi_client import WSGIClient, default_host
+
+
+def get_live_at(pub_date):
+    live_at = visibility_now(pub_date)
+    if live_at < pub_date:
+        live_at += timedelta(seconds=settings.VISIBILITY_CLOCK_BUCKET)
+    return live_at
+
+
+class Command(BaseCommand):
+    help = (
+        'Следит за отложенными публикациями и в момент их выхода '
+        'сбрасывает и заново прогревает кеш первых страниц ленты.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--refresh',
+            type=int,
+            default=60,
+            help='Как часто перечитывать отложенные публикации (секунды).',
+        )
+        parser.add_argument(
+            '--host',
+            default=None,
+            help=(
+                'Значение заголовка Host для прогревающих запросов; '
+                'по умолчанию первый из ALLOWED_HOSTS.'
+            ),
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help=(
+                'Обработать публикации, вышедшие за последний период '
+                '--refresh, и завершить работу (для запуска из cron).'
+            ),
+        )
+
+    def handle(self, *args, **options):
+        self.check_cache()
+        self.client = WSGIClient(
+            WSGIHandler(), options['host'] or default_host()
+        )
+        self.queue = []
+        self.queued_ids = set()
+        self.lags = []
+        refresh = timedelta(seconds=options['refresh'])
+        try:
+            if options['once']:
+                failed = self.publish(self.load_due(refresh))
+                if failed:
+                    raise CommandError(
+                        f'Не удалось прогреть страниц: {failed}.'
+                    )
+                return
+            self.load_upcoming(refresh)
+            next_refresh = timezone.now() + refresh
+            while True:
+                now = timezone.now()
+                if now >= next_refresh:
+                    self.load_upcoming(refresh)
+                    next_refresh = now + refresh
+                due = []
+                while self.queue and self.queue[0][0] <= now:
+                    live_at, post_id = heapq.heappop(self.queue)
+                    self.queued_ids.discard(post_id)
+                    due.append(post_id)
+                if due:
+                    self.publish(due)
+                wake_at = next_refresh
+                if self.queue:
+                    wake_at = min(wake_at, self.queue[0][0])
+                time.sleep(
+                    max((wake_at - timezone.now()).total_seconds(), 0)
+                )
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.report()
+
+    def check_cache(self):
+        backend = settings.CACHES[DEFAULT_CACHE_ALIAS]['BACKEND']
+        if backend in PROCESS_LOCAL_CACHES:
+            self.stderr.write(
+                f'Кеш {backend} хранится в памяти этого процесса: '
+                'веб-процессы не увидят ни сброса версий, ни прогретых '
+                'страниц.'
+            )
+
+    def load_due(self, period):
+        now = visibility_now()
+        return list(Post.objects.filter(
+            is_published=True,
+            pub_date__lte=now,
+            pub_date__gt=now - period,
+        ).values_list('id', flat=True))
+
+    def load_upcoming(self, horizon):
+        now = visibility_now()
+        upcoming = Post.objects.filter(
+            is_published=True,
+            pub_date__gt=now,
+            pub_date__lte=now + horizon * 2,
+        ).values_list('pub_date', 'id')
+        for pub_date, post_id in upcoming:
+            if post_id not in self.queued_ids:
+                self.queued_ids.add(post_id)
+                heapq.heappush(self.queue, (get_live_at(pub_date), post_id))
+
+    def publish(self, post_ids):
+        posts = Post.objects.filter(
+            id__in=post_ids,
+            is_published=True,
+            category__is_published=True,
+            pub_date__lte=visibility_now(),
+        ).values_list('id', 'pub_date', 'author__username', 'category__slug')
+        scopes = {FEED_SCOPE}
+        urls = {reverse('blog:index')}
+        live_ats = []
+        for post_id, pub_date, username, category_slug in posts:
+            scopes.update((
+                post_scope(post_id),
+                author_scope(username),
+                category_scope(category_slug),
+            ))
+            urls.update((
+                reverse('blog:profile', args=[username]),
+                reverse('blog:category_posts', args=[category_slug]),
+            ))
+            live_ats.append((post_id, get_live_at(pub_date)))
+        if not live_ats:
+            return 0
+        bump_versions(*scopes)
+        started = time.perf_counter()
+        failed = 0
+        for url in sorted(urls):
+            status = self.client.request('GET', url)
+            if status != 200:
+                failed += 1
+                self.stderr.write(
+                    f'Страница {url} ответила {status} и не прогрета; '
+                    f'проверьте --host «{self.client.host}».'
+                )
+        warmed_in = time.perf_counter() - started
+        warmed_at = timezone.now()
+        for post_id, live_at in live_ats:
+            lag = (warmed_at - live_at).total_seconds()
+            self.lags.append(lag)
+            self.stdout.write(
+                f'Публикация {post_id}: вышла {live_at:%Y-%m-%d %H:%M:%S}, '
+                f'задержка {lag:.3f} с, прогрето страниц: {len(urls)} '
+                f'за {warmed_in:.3f} с'
+            )
+        return failed
+
+    def report(self):
+        if not self.lags:
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f'Опубликовано: {len(self.lags)}, '
+            f'средняя задержка {sum(self.lags) / len(self.lags):.3f} с, '
+            f'максимальная {max(self.lags):.3f} с'
+        ))
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from blog.models import Comment, Post
+from blog.versions import FEED_SCOPE, REFS_SCOPE, bump_versions
+
+
+def rebuild_comment_counts(posts=Post.objects, comments=Comment.objects):
+    """Исправляет счётчики, которые разошлись с числом комментариев, и
+    возвращает, сколько публикаций изменилось."""
+    counts = comments.filter(post=OuterRef('pk')).order_by().values(
+        'post'
+    ).annotate(count=Count('pk')).values('count')
+    actual = Coalesce(Subquery(counts), 0)
+    return posts.alias(actual=actual).exclude(
+        comment_count=F('actual')
+    ).update(comment_count=actual)
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает количество комментариев у публикаций.'
+
+    def handle(self, *args, **options):
+        updated = rebuild_comment_counts()
+        if updated:
+            bump_versions(FEED_SCOPE, REFS_SCOPE)
+        self.stdout.write(
+            self.style.SUCCESS(f'Обновлено публикаций: {updated}')
+        )
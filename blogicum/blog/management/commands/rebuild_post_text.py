@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import Post
+from blog.text import render_excerpt, render_text_html
+from blog.versions import FEED_SCOPE, REFS_SCOPE, bump_versions
+
+BATCH_SIZE = 500
+
+
+def rebuild_post_text(posts=Post.objects, batch_size=BATCH_SIZE):
+    updated = 0
+    batch = []
+    for post in posts.only('id', 'text').iterator(batch_size):
+        post.text_html = render_text_html(post.text)
+        post.excerpt = render_excerpt(post.text)
+        batch.append(post)
+        if len(batch) == batch_size:
+            Post.objects.bulk_update(batch, ['text_html', 'excerpt'])
+            updated += len(batch)
+            batch = []
+    Post.objects.bulk_update(batch, ['text_html', 'excerpt'])
+    return updated + len(batch)
+
+
+class Command(BaseCommand):
+    help = (
+        'Заново готовит HTML текста и начала текста публикаций, '
+        'например после изменения текстов через QuerySet.update().'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='Сколько публикаций обновлять одним запросом.',
+        )
+
+    def handle(self, *args, **options):
+        updated = rebuild_post_text(batch_size=options['batch_size'])
+        if updated:
+            bump_versions(FEED_SCOPE, REFS_SCOPE)
+        self.stdout.write(
+            self.style.SUCCESS(f'Обновлено публикаций: {updated}')
+        )
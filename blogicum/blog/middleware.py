@@ -0,0 +1,102 @@
+import json
+import logging
+from contextvars import ContextVar
+from time import perf_counter
+
+from django.db import connection
+
+logger = logging.getLogger('blog.timing')
+current_timing = ContextVar('current_timing', default=None)
+
+
+class RequestTiming:
+    __slots__ = (
+        'started',
+        'total',
+        'queries',
+        'db_time',
+        'render_started',
+        'template_time',
+        'cache_hits',
+        'cache_misses',
+    )
+
+    def __init__(self):
+        self.started = perf_counter()
+        self.total = 0.0
+        self.queries = 0
+        self.db_time = 0.0
+        self.render_started = None
+        self.template_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def record_query(self, execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += perf_counter() - started
+            self.queries += 1
+
+    def finish_render(self, response):
+        self.template_time += perf_counter() - self.render_started
+
+    def server_timing(self):
+        return (
+            f'db;dur={self.db_time * 1000:.2f};desc="{self.queries} queries", '
+            f'tpl;dur={self.template_time * 1000:.2f}, '
+            f'cache;desc="hit={self.cache_hits} miss={self.cache_misses}", '
+            f'total;dur={self.total * 1000:.2f}'
+        )
+
+    def as_dict(self):
+        return {
+            'total_ms': round(self.total * 1000, 2),
+            'db_ms': round(self.db_time * 1000, 2),
+            'queries': self.queries,
+            'template_ms': round(self.template_time * 1000, 2),
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+        }
+
+
+def record_cache(hits=0, misses=0):
+    timing = current_timing.get()
+    if timing is not None:
+        timing.cache_hits += hits
+        timing.cache_misses += misses
+
+
+class ServerTimingMiddleware:
+    """Считает запросы к БД, время отрисовки шаблона и попадания в кеш,
+    отдаёт их в заголовке Server-Timing и в строке журнала blog.timing."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timing = RequestTiming()
+        token = current_timing.set(timing)
+        try:
+            with connection.execute_wrapper(timing.record_query):
+                response = self.get_response(request)
+        finally:
+            current_timing.reset(token)
+        timing.total = perf_counter() - timing.started
+        response['Server-Timing'] = timing.server_timing()
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(json.dumps({
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                **timing.as_dict(),
+            }))
+        return response
+
+    def process_template_response(self, request, response):
+        timing = current_timing.get()
+        if timing is not None:
+            timing.render_started = perf_counter()
+            response.add_post_render_callback(timing.finish_render)
+        return response
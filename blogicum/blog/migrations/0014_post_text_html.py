@@ -0,0 +1,41 @@
+# Generated by Django 3.2.16 on 2026-10-17 04:37
+
+from django.db import migrations, models
+
+from blog.text import render_excerpt, render_text_html
+
+BATCH_SIZE = 500
+
+
+def fill_text_html(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    batch = []
+    for post in Post.objects.only('id', 'text').iterator(BATCH_SIZE):
+        post.text_html = render_text_html(post.text)
+        post.excerpt = render_excerpt(post.text)
+        batch.append(post)
+        if len(batch) == BATCH_SIZE:
+            Post.objects.bulk_update(batch, ['text_html', 'excerpt'])
+            batch = []
+    Post.objects.bulk_update(batch, ['text_html', 'excerpt'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0013_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.TextField(default='', editable=False, verbose_name='Начало текста в HTML'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='text_html',
+            field=models.TextField(default='', editable=False, verbose_name='Текст в HTML'),
+        ),
+        migrations.RunPython(fill_text_html, migrations.RunPython.noop),
+    ]
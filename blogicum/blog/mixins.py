@@ -1,11 +1,32 @@
+from http import HTTPStatus
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.http import HttpResponse
 from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.functional import cached_property
+from django.utils.http import http_date
 from django.contrib.auth.mixins import UserPassesTestMixin
 
+from .caching import page_cache_key, page_etag, render_post_cards
+from .clock import visibility_tick
 from .models import Post, Comment
 from .forms import CreateCommentForm
+from .middleware import record_cache
+from .read_models import load_post_cards
+from .references import reference_cache
+from .pagination import (
+    CachedCountPaginator,
+    count_cache_key,
+    keyset_paginate,
+)
+from .versions import get_versions_and_changes
 
 User = get_user_model()
+PAGE_RANGE_ON_EACH_SIDE = 2
+PAGE_RANGE_ON_ENDS = 1
 
 
 class PostMixin:
@@ -13,11 +34,155 @@ class PostMixin:
     pk_url_kwarg = 'post_id'
 
 
+class VersionedPageMixin:
+    cache_by_visibility_clock = False
+
+    def get_cache_scopes(self):
+        raise NotImplementedError
+
+    @cached_property
+    def scope_state(self):
+        return get_versions_and_changes(*self.get_cache_scopes())
+
+    @cached_property
+    def scope_versions(self):
+        return self.scope_state[0]
+
+    @cached_property
+    def cache_tick(self):
+        return visibility_tick() if self.cache_by_visibility_clock else ''
+
+
+class ConditionalGetMixin(VersionedPageMixin):
+    """Отвечает 304 по ETag и Last-Modified из версий областей кеша
+    до обращения к базе данных и отрисовки шаблона."""
+
+    def get_last_modified(self):
+        last_modified = max(self.scope_state[1]) // 1000
+        if self.cache_tick != '':
+            last_modified = max(
+                last_modified,
+                self.cache_tick * settings.VISIBILITY_CLOCK_BUCKET,
+            )
+        return last_modified
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return super().dispatch(request, *args, **kwargs)
+        etag = page_etag(request, self.scope_versions, self.cache_tick)
+        last_modified = self.get_last_modified()
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+        if response.status_code in (HTTPStatus.OK, HTTPStatus.NOT_MODIFIED):
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+
+class AnonymousPageCacheMixin(VersionedPageMixin):
+    def dispatch(self, request, *args, **kwargs):
+        if request.method != 'GET' or request.user.is_authenticated:
+            return super().dispatch(request, *args, **kwargs)
+        key = page_cache_key(request, self.scope_versions, self.cache_tick)
+        content = cache.get(key)
+        record_cache(hits=content is not None, misses=content is None)
+        if content is not None:
+            return HttpResponse(content)
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code == HTTPStatus.OK:
+            response.add_post_render_callback(
+                lambda response: cache.set(
+                    key, response.content, settings.PAGE_CACHE_TIMEOUT
+                )
+            )
+        return response
+
+
+class KeysetPaginationMixin:
+    def load_posts(self, posts):
+        return list(posts)
+
+    def paginate_queryset(self, queryset, page_size):
+        after = self.request.GET.get('after')
+        before = self.request.GET.get('before')
+        if after is None and before is None:
+            paginator, page, posts, is_paginated = super().paginate_queryset(
+                queryset, page_size
+            )
+            page.object_list = posts = self.load_posts(posts)
+            return paginator, page, posts, is_paginated
+        page = keyset_paginate(
+            queryset, page_size, after, before, load=self.load_posts
+        )
+        return None, page, page.object_list, page.has_other_pages()
+
+
+class CachedCountMixin:
+    paginator_class = CachedCountPaginator
+
+    def get_visibility(self):
+        return 'public'
+
+    def get_paginator(self, queryset, per_page, orphans=0,
+                      allow_empty_first_page=True, **kwargs):
+        return super().get_paginator(
+            queryset,
+            per_page,
+            orphans,
+            allow_empty_first_page,
+            cache_key=count_cache_key(
+                (
+                    type(self).__name__,
+                    self.get_visibility(),
+                    visibility_tick(),
+                    # Версии разных категорий или авторов могут совпасть.
+                    *self.get_cache_scopes(),
+                ),
+                self.scope_versions,
+            ),
+            **kwargs,
+        )
+
+
+class PostListMixin(
+    ConditionalGetMixin,
+    AnonymousPageCacheMixin,
+    KeysetPaginationMixin,
+    CachedCountMixin,
+    PostMixin,
+):
+    cache_by_visibility_clock = True
+
+    def load_posts(self, posts):
+        references = reference_cache.get()
+        if settings.FEED_READ_MODELS:
+            return load_post_cards(posts, references)
+        posts = list(posts)
+        references.attach(posts)
+        return posts
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        render_post_cards(context['object_list'])
+        paginator = context['paginator']
+        if paginator is not None:
+            context['page_range'] = paginator.get_elided_page_range(
+                context['page_obj'].number,
+                on_each_side=PAGE_RANGE_ON_EACH_SIDE,
+                on_ends=PAGE_RANGE_ON_ENDS,
+            )
+        return context
+
+
 class CommentChangeMixin:
     model = Comment
     pk_url_kwarg = 'comment_pk'
     template_name = 'blog/comment.html'
     form_class = CreateCommentForm
+    related_fields = ('post__author', 'post__category')
 
     def get_success_url(self):
         return reverse(
@@ -31,6 +196,23 @@ class CommentChangeMixin:
         return context
 
 
-class AuthorAccessMixin(UserPassesTestMixin):
+class CachedObjectMixin:
+    related_fields = ()
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.related_fields:
+            queryset = queryset.select_related(*self.related_fields)
+        return queryset
+
+    def get_object(self, queryset=None):
+        if queryset is not None:
+            return super().get_object(queryset)
+        if not hasattr(self, '_object'):
+            self._object = super().get_object()
+        return self._object
+
+
+class AuthorAccessMixin(CachedObjectMixin, UserPassesTestMixin):
     def test_func(self):
-        return self.get_object().author == self.request.user
+        return self.get_object().author_id == self.request.user.id
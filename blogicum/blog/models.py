@@ -1,6 +1,8 @@
 from django.contrib.auth import get_user_model
 from django.db import models
 
+from .text import render_excerpt, render_text_html
+
 
 CHAR_LEN = 256
 TITLE_LEN = 20
@@ -64,6 +66,16 @@ class Post(BaseBlogModel):
         verbose_name='Заголовок',
     )
     text = models.TextField(max_length=256, verbose_name='Текст')
+    text_html = models.TextField(
+        editable=False,
+        default='',
+        verbose_name='Текст в HTML',
+    )
+    excerpt = models.TextField(
+        editable=False,
+        default='',
+        verbose_name='Начало текста в HTML',
+    )
     pub_date = models.DateTimeField(
         auto_now=False,
         auto_now_add=False,
@@ -94,15 +106,52 @@ class Post(BaseBlogModel):
         related_name='posts'
     )
     image = models.ImageField('Изображение', blank=True, upload_to='img/')
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Комментариев',
+    )
 
     class Meta:
         ordering = ('-pub_date',)
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
+        indexes = (
+            models.Index(
+                fields=('is_published', '-pub_date', '-id'),
+                name='post_published_pub_date_id_idx',
+            ),
+            models.Index(
+                fields=('-pub_date', '-id'),
+                condition=models.Q(is_published=True),
+                name='post_feed_pub_date_id_idx',
+            ),
+            models.Index(
+                fields=('author', '-pub_date', '-id'),
+                name='post_author_pub_date_id_idx',
+            ),
+            models.Index(
+                fields=('category', '-pub_date', '-id'),
+                name='post_category_pub_date_id_idx',
+            ),
+        )
 
     def __str__(self):
         return self.title[:TITLE_LEN]
 
+    def render_text(self):
+        self.text_html = render_text_html(self.text)
+        self.excerpt = render_excerpt(self.text)
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None:
+            self.render_text()
+        elif 'text' in update_fields:
+            self.render_text()
+            kwargs['update_fields'] = {*update_fields, 'text_html', 'excerpt'}
+        super().save(*args, **kwargs)
+
 
 class Comment(models.Model):
     text = models.TextField(verbose_name='Текст комментария')
@@ -120,6 +169,12 @@ class Comment(models.Model):
         ordering = ('created_at',)
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = (
+            models.Index(
+                fields=('post', 'created_at', 'id'),
+                name='comment_post_created_id_idx',
+            ),
+        )
 
     def __str__(self):
         return self.text[:TITLE_LEN]
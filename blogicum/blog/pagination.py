@@ -0,0 +1,159 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.http import Http404
+from django.utils.functional import cached_property
+
+from .middleware import record_cache
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+MICROSECOND = timedelta(microseconds=1)
+COUNT_KEY = 'blog:count:{}:{}'
+
+
+def encode_cursor(obj, field='pub_date'):
+    return f'{(getattr(obj, field) - EPOCH) // MICROSECOND},{obj.id}'
+
+
+def decode_cursor(cursor):
+    try:
+        pub_date, post_id = cursor.split(',')
+        return EPOCH + int(pub_date) * MICROSECOND, int(post_id)
+    except (ValueError, OverflowError):
+        raise Http404('Неверный курсор страницы.')
+
+
+class KeysetPage:
+    is_keyset = True
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+def keyset_paginate(queryset, page_size, after=None, before=None,
+                    load=list):
+    """Страница ленты, упорядоченной по (-pub_date, -id), после или до
+    курсора; стоимость не зависит от глубины страницы."""
+    if before is not None:
+        pub_date, post_id = decode_cursor(before)
+        posts = load(queryset.filter(
+            Q(pub_date__gt=pub_date) | Q(pub_date=pub_date, id__gt=post_id)
+        ).order_by('pub_date', 'id')[:page_size + 1])
+        has_more = len(posts) > page_size
+        posts = posts[:page_size][::-1]
+        has_previous, has_next = has_more, True
+    else:
+        if after is not None:
+            pub_date, post_id = decode_cursor(after)
+            queryset = queryset.filter(
+                Q(pub_date__lt=pub_date)
+                | Q(pub_date=pub_date, id__lt=post_id)
+            )
+        posts = load(
+            queryset.order_by('-pub_date', '-id')[:page_size + 1]
+        )
+        has_next = len(posts) > page_size
+        posts = posts[:page_size]
+        has_previous = after is not None
+    if not posts:
+        return KeysetPage(posts)
+    return KeysetPage(
+        posts,
+        next_cursor=encode_cursor(posts[-1]) if has_next else None,
+        previous_cursor=encode_cursor(posts[0]) if has_previous else None,
+    )
+
+
+def keyset_paginate_ascending(queryset, page_size, field, after=None):
+    """Страница, упорядоченная по (field, id), после курсора; так
+    подгружаются комментарии под публикацией."""
+    if after is not None:
+        value, object_id = decode_cursor(after)
+        queryset = queryset.filter(
+            Q(**{f'{field}__gt': value})
+            | Q(**{field: value, 'id__gt': object_id})
+        )
+    objects = list(queryset.order_by(field, 'id')[:page_size + 1])
+    if len(objects) <= page_size:
+        return KeysetPage(objects)
+    objects = objects[:page_size]
+    return KeysetPage(objects, next_cursor=encode_cursor(objects[-1], field))
+
+
+def count_cache_key(parts, versions):
+    return COUNT_KEY.format(
+        ':'.join(map(str, parts)), '-'.join(map(str, versions))
+    )
+
+
+def estimate_count(queryset):
+    """Оценка планировщика PostgreSQL вместо точного COUNT для выборок,
+    которые и по оценке больше порога. У небольшой ленты автора или
+    категории ошибка оценки заметна (лишние или пропавшие страницы),
+    а точный подсчёт дёшев. Таблица меньше порога не проверяется
+    вовсе."""
+    threshold = settings.FEED_COUNT_ESTIMATE_THRESHOLD
+    connection = connections[queryset.db]
+    if threshold is None or connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT reltuples FROM pg_class WHERE relname = %s',
+            [queryset.model._meta.db_table],
+        )
+        row = cursor.fetchone()
+    if row is None or row[0] < threshold:
+        return None
+    plan = json.loads(queryset.explain(format='json'))
+    rows = int(plan[0]['Plan']['Plan Rows'])
+    return rows if rows >= threshold else None
+
+
+class CachedCountPaginator(Paginator):
+    def __init__(self, object_list, per_page, orphans=0,
+                 allow_empty_first_page=True, cache_key=None):
+        super().__init__(
+            object_list, per_page, orphans, allow_empty_first_page
+        )
+        self.cache_key = cache_key
+
+    @cached_property
+    def count(self):
+        if self.cache_key is None:
+            return super().count
+        count = cache.get(self.cache_key)
+        record_cache(hits=count is not None, misses=count is None)
+        if count is None:
+            queryset = self.object_list.select_related(None).order_by()
+            count = estimate_count(queryset)
+            if count is None:
+                count = queryset.count()
+            cache.set(
+                self.cache_key, count, settings.FEED_COUNT_CACHE_TIMEOUT
+            )
+        return count
@@ -0,0 +1,93 @@
+from .models import Post
+
+POST_CARD_FIELDS = (
+    'id',
+    'title',
+    'excerpt',
+    'pub_date',
+    'image',
+    'is_published',
+    'comment_count',
+    'author_id',
+    'author__username',
+    'category_id',
+    'location_id',
+)
+IMAGE_STORAGE = Post._meta.get_field('image').storage
+
+
+class ImageRef:
+    __slots__ = ('name',)
+
+    def __init__(self, name):
+        self.name = name
+
+    def __bool__(self):
+        return bool(self.name)
+
+    @property
+    def url(self):
+        return IMAGE_STORAGE.url(self.name)
+
+
+class AuthorRef:
+    __slots__ = ('id', 'username')
+
+    def __init__(self, id, username):
+        self.id = id
+        self.username = username
+
+
+class PostCard:
+    __slots__ = (
+        'id',
+        'title',
+        'excerpt',
+        'pub_date',
+        'image',
+        'is_published',
+        'comment_count',
+        'author',
+        'category',
+        'location',
+        'rendered_card',
+    )
+
+    def __init__(self, id, title, excerpt, pub_date, image, is_published,
+                 comment_count, author, category, location):
+        self.id = id
+        self.title = title
+        self.excerpt = excerpt
+        self.pub_date = pub_date
+        self.image = image
+        self.is_published = is_published
+        self.comment_count = comment_count
+        self.author = author
+        self.category = category
+        self.location = location
+        self.rendered_card = None
+
+
+def load_post_cards(posts, references):
+    authors = {}
+    cards = []
+    for (
+        post_id, title, excerpt, pub_date, image, is_published, comment_count,
+        author_id, username, category_id, location_id
+    ) in posts.values_list(*POST_CARD_FIELDS):
+        author = authors.get(author_id)
+        if author is None:
+            author = authors[author_id] = AuthorRef(author_id, username)
+        cards.append(PostCard(
+            post_id,
+            title,
+            excerpt,
+            pub_date,
+            ImageRef(image),
+            is_published,
+            comment_count,
+            author,
+            references.categories.get(category_id),
+            references.locations.get(location_id),
+        ))
+    return cards
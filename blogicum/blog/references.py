@@ -0,0 +1,56 @@
+from time import monotonic
+
+from django.conf import settings
+
+from .models import Category, Location, Post
+from .versions import REFS_SCOPE, get_versions
+
+
+class References:
+    def __init__(self, version, categories, locations):
+        self.version = version
+        self.loaded_at = monotonic()
+        self.categories = {category.id: category for category in categories}
+        self.locations = {location.id: location for location in locations}
+
+    def is_fresh(self, version):
+        return (
+            self.version == version
+            and monotonic() - self.loaded_at
+            < settings.REFERENCE_CACHE_TIMEOUT
+        )
+
+    def attach(self, posts):
+        for post in posts:
+            Post.category.field.set_cached_value(
+                post, self.categories.get(post.category_id)
+            )
+            Post.location.field.set_cached_value(
+                post, self.locations.get(post.location_id)
+            )
+
+
+class ReferenceCache:
+    """Копия категорий и местоположений в памяти процесса для отрисовки
+    карточек; видимость публикаций по-прежнему проверяется в SQL.
+
+    Перечитывается, когда меняется общая для всех процессов версия
+    `refs` в кеше Django, и не реже раза в REFERENCE_CACHE_TIMEOUT.
+    """
+
+    def __init__(self):
+        self._references = None
+
+    def get(self):
+        version, = get_versions(REFS_SCOPE)
+        references = self._references
+        if references is None or not references.is_fresh(version):
+            references = self._references = References(
+                version,
+                list(Category.objects.all()),
+                list(Location.objects.all()),
+            )
+        return references
+
+
+reference_cache = ReferenceCache()
@@ -0,0 +1,203 @@
+from contextvars import ContextVar
+
+from django.db.models import F
+from django.db.models.signals import (
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from .models import Category, Comment, Location, Post, User
+from .versions import (
+    FEED_SCOPE,
+    REFS_SCOPE,
+    author_scope,
+    bump_versions_on_commit,
+    category_scope,
+    post_scope,
+)
+
+# Публикации, которые удаляются вместе с комментариями: для их
+# комментариев не нужно ни обновлять счётчик, ни сбрасывать версии.
+# Отметка живёт от pre_delete до post_delete публикации в одном проходе
+# Collector; отметку прерванного удаления снимает следующее удаление
+# комментария (см. forget_interrupted_deletes).
+deleting_post_ids = ContextVar('deleting_post_ids', default=frozenset())
+
+
+def is_deleted_with_post(comment):
+    return comment.post_id in deleting_post_ids.get()
+
+
+def change_comment_count(post_id, delta):
+    posts = Post.objects.filter(pk=post_id)
+    if delta < 0:
+        posts = posts.filter(comment_count__gte=-delta)
+    posts.update(comment_count=F('comment_count') + delta)
+
+
+@receiver(pre_save, sender=Comment)
+def move_comment_count(sender, instance, raw, **kwargs):
+    if raw or instance._state.adding:
+        return
+    old_post_id = Comment.objects.filter(pk=instance.pk).values_list(
+        'post_id', flat=True
+    ).first()
+    if old_post_id is not None and old_post_id != instance.post_id:
+        change_comment_count(old_post_id, -1)
+        change_comment_count(instance.post_id, 1)
+
+
+@receiver(post_save, sender=Comment)
+def increase_comment_count(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        change_comment_count(instance.post_id, 1)
+
+
+@receiver(pre_delete, sender=Post)
+def mark_post_deleting(sender, instance, **kwargs):
+    deleting_post_ids.set(deleting_post_ids.get() | {instance.pk})
+
+
+@receiver(post_delete, sender=Post)
+def unmark_post_deleting(sender, instance, **kwargs):
+    deleting_post_ids.set(deleting_post_ids.get() - {instance.pk})
+
+
+@receiver(pre_delete, sender=Comment)
+def forget_interrupted_deletes(sender, **kwargs):
+    """Collector рассылает pre_delete комментариев раньше, чем pre_delete
+    их публикаций, поэтому отметки, которые видны здесь, остались от
+    удаления, прерванного ошибкой."""
+    if deleting_post_ids.get():
+        deleting_post_ids.set(frozenset())
+
+
+@receiver(post_delete, sender=Comment)
+def decrease_comment_count(sender, instance, **kwargs):
+    if not is_deleted_with_post(instance):
+        change_comment_count(instance.post_id, -1)
+
+
+def get_post_scopes(post_id, username, category_slug):
+    scopes = [FEED_SCOPE, post_scope(post_id), author_scope(username)]
+    if category_slug is not None:
+        scopes.append(category_scope(category_slug))
+    return scopes
+
+
+def get_saved_post_scopes(post):
+    category = post.category if post.category_id else None
+    return get_post_scopes(
+        post.id,
+        post.author.username,
+        category.slug if category is not None else None,
+    )
+
+
+def get_stored_post_scopes(post_id):
+    stored = Post.objects.filter(pk=post_id).values_list(
+        'author__username', 'category__slug'
+    ).first()
+    if stored is None:
+        return [post_scope(post_id)]
+    return get_post_scopes(post_id, *stored)
+
+
+def get_known_post_scopes(post):
+    """Области по уже загруженным автору и категории, иначе одним
+    запросом, а не отдельной загрузкой каждого из них."""
+    if Post.author.is_cached(post) and (
+        post.category_id is None or Post.category.is_cached(post)
+    ):
+        return get_saved_post_scopes(post)
+    return get_stored_post_scopes(post.pk)
+
+
+@receiver(pre_save, sender=Post)
+def remember_post_scopes(sender, instance, raw, **kwargs):
+    instance._previous_scopes = ()
+    if not raw and not instance._state.adding:
+        instance._previous_scopes = get_stored_post_scopes(instance.pk)
+
+
+@receiver(post_save, sender=Post)
+def render_loaded_text(sender, instance, raw, using, **kwargs):
+    """loaddata сохраняет публикации без save(), поэтому HTML текста
+    готовится после загрузки каждой из них."""
+    if raw:
+        instance.render_text()
+        Post.objects.using(using).filter(pk=instance.pk).update(
+            text_html=instance.text_html, excerpt=instance.excerpt
+        )
+
+
+@receiver(post_save, sender=Post)
+def bump_post_versions(sender, instance, using, raw, **kwargs):
+    if raw:
+        return
+    bump_versions_on_commit(
+        *get_saved_post_scopes(instance),
+        *instance._previous_scopes,
+        using=using,
+    )
+
+
+@receiver(pre_delete, sender=Post)
+def remember_deleted_post_scopes(sender, instance, **kwargs):
+    instance._deleted_scopes = get_known_post_scopes(instance)
+
+
+@receiver(post_delete, sender=Post)
+def bump_deleted_post_versions(sender, instance, using, **kwargs):
+    bump_versions_on_commit(*instance._deleted_scopes, using=using)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def bump_comment_versions(sender, instance, using, signal, raw=False,
+                          created=True, **kwargs):
+    if raw or signal is post_delete and is_deleted_with_post(instance):
+        return
+    if not created:
+        scopes = [post_scope(instance.post_id)]
+    elif Comment.post.is_cached(instance):
+        scopes = get_saved_post_scopes(instance.post)
+    else:
+        scopes = get_stored_post_scopes(instance.post_id)
+    bump_versions_on_commit(*scopes, using=using)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def bump_reference_versions(sender, instance, using, raw=False, **kwargs):
+    if not raw:
+        bump_versions_on_commit(REFS_SCOPE, using=using)
+
+
+@receiver(pre_save, sender=User)
+def remember_username(sender, instance, raw, update_fields, **kwargs):
+    instance._previous_username = None
+    if raw or instance._state.adding:
+        return
+    if update_fields is not None and 'username' not in update_fields:
+        return
+    instance._previous_username = User.objects.filter(
+        pk=instance.pk
+    ).values_list('username', flat=True).first()
+
+
+@receiver(post_save, sender=User)
+def bump_username_versions(sender, instance, using, **kwargs):
+    username = getattr(instance, '_previous_username', None)
+    if username is not None and username != instance.username:
+        bump_versions_on_commit(
+            REFS_SCOPE,
+            author_scope(username),
+            author_scope(instance.username),
+            using=using,
+        )
@@ -0,0 +1,16 @@
+from django import template
+
+from blog.versions import SCOPE_BUILDERS, get_versions
+
+register = template.Library()
+
+
+@register.simple_tag
+def content_version(*scopes, **objects):
+    """Версия содержимого для ключа {% cache %} или ETag:
+    {% content_version 'refs' post=post.id as version %}."""
+    scopes = (
+        *scopes,
+        *(SCOPE_BUILDERS[kind](value) for kind, value in objects.items()),
+    )
+    return '-'.join(map(str, get_versions(*scopes)))
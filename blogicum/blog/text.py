@@ -0,0 +1,15 @@
+from django.template.defaultfilters import (
+    linebreaks_filter,
+    linebreaksbr,
+    truncatewords,
+)
+
+EXCERPT_WORDS = 10
+
+
+def render_text_html(text):
+    return str(linebreaksbr(text))
+
+
+def render_excerpt(text):
+    return str(truncatewords(linebreaks_filter(text), EXCERPT_WORDS))
@@ -32,6 +32,11 @@ urlpatterns = [
         views.CategoryListView.as_view(),
         name='category_posts'
     ),
+    path(
+        'posts/<int:post_id>/comments/',
+        views.CommentListView.as_view(),
+        name='comments',
+    ),
     path(
         'posts/<int:post_id>/comment/',
         views.CommentCreateView.as_view(),
@@ -0,0 +1,97 @@
+from time import time_ns
+
+from django.core.cache import cache
+from django.db import transaction
+
+VERSION_KEY = 'blog:version:{}'
+CHANGED_KEY = 'blog:changed:{}'
+# Области версий: лента целиком, справочники (категории, местоположения,
+# имена авторов) и отдельные публикации, авторы и категории.
+FEED_SCOPE = 'feed'
+REFS_SCOPE = 'refs'
+
+
+def post_scope(post_id):
+    return f'post:{post_id}'
+
+
+def author_scope(username):
+    return f'author:{username}'
+
+
+def category_scope(slug):
+    return f'category:{slug}'
+
+
+SCOPE_BUILDERS = {
+    'post': post_scope,
+    'author': author_scope,
+    'category': category_scope,
+}
+
+
+def now_version():
+    return time_ns() // 1_000_000
+
+
+def read_versions(keys, stored):
+    missing = [key for key in keys if key not in stored]
+    if missing:
+        # add не перезапишет версию, которую успел создать или сбросить
+        # другой процесс, поэтому после него версии перечитываются.
+        now = now_version()
+        for key in missing:
+            cache.add(key, now, timeout=None)
+        added = cache.get_many(missing)
+        stored.update({key: added.get(key, now) for key in missing})
+    return tuple(stored[key] for key in keys)
+
+
+def get_versions(*scopes):
+    keys = [VERSION_KEY.format(scope) for scope in scopes]
+    return read_versions(keys, cache.get_many(keys))
+
+
+def get_versions_and_changes(*scopes):
+    """Версии областей и время их последнего изменения в миллисекундах
+    за одно обращение к кешу. Новая версия равна времени создания, а
+    incr сдвигает её лишь на единицу, поэтому время сброса хранится
+    отдельно."""
+    keys = [VERSION_KEY.format(scope) for scope in scopes]
+    changed_keys = [CHANGED_KEY.format(scope) for scope in scopes]
+    stored = cache.get_many(keys + changed_keys)
+    versions = read_versions(keys, stored)
+    changes = tuple(
+        max(stored.get(changed_key, 0), version)
+        for changed_key, version in zip(changed_keys, versions)
+    )
+    return versions, changes
+
+
+def bump_versions(*scopes):
+    """Увеличивает версии атомарно: incr не теряет сбросов из других
+    процессов. Пропавшая версия создаётся заново текущим временем в
+    миллисекундах, которое больше любой прежней. Время сброса нужно
+    только для Last-Modified с точностью до секунды, поэтому его
+    достаточно просто записать."""
+    now = now_version()
+    for key in {VERSION_KEY.format(scope) for scope in scopes}:
+        if cache.add(key, now, timeout=None):
+            continue
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Ключ вытеснили между add и incr.
+            cache.add(key, now, timeout=None)
+    cache.set_many(
+        {CHANGED_KEY.format(scope): now for scope in scopes}, timeout=None
+    )
+
+
+def bump_versions_on_commit(*scopes, using=None):
+    """Внутри транзакции сбрасывает версии сразу и ещё раз после её
+    фиксации: до фиксации другой процесс может закешировать старые
+    строки уже под новой версией."""
+    bump_versions(*scopes)
+    if transaction.get_connection(using).in_atomic_block:
+        transaction.on_commit(lambda: bump_versions(*scopes), using=using)
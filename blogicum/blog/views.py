@@ -1,6 +1,3 @@
-from datetime import datetime
-
-from django.db.models import Count
 from django.views.generic import (
     CreateView,
     DeleteView,
@@ -8,71 +5,131 @@ from django.views.generic import (
     ListView,
     UpdateView,
 )
+from django.http import Http404
 from django.shortcuts import get_object_or_404, redirect
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.urls import reverse, reverse_lazy
+from django.utils.functional import cached_property
 
+from .clock import visibility_now
 from .models import Category, Post, User
-from .mixins import PostMixin, AuthorAccessMixin, CommentChangeMixin
+from .mixins import (
+    AnonymousPageCacheMixin,
+    AuthorAccessMixin,
+    CommentChangeMixin,
+    ConditionalGetMixin,
+    PostListMixin,
+    PostMixin,
+)
 from .forms import CreateCommentForm, CreatePostForm, EditUserForm
+from .pagination import keyset_paginate_ascending
+from .versions import (
+    FEED_SCOPE,
+    REFS_SCOPE,
+    author_scope,
+    category_scope,
+    post_scope,
+)
 
 POSTS_PER_PAGE = 10
+COMMENTS_PER_PAGE = 10
+COMMENT_FIELDS = (
+    'id',
+    'text',
+    'created_at',
+    'post_id',
+    'author__id',
+    'author__username',
+)
+FEED_FIELDS = (
+    'id',
+    'title',
+    'excerpt',
+    'pub_date',
+    'image',
+    'is_published',
+    'comment_count',
+    'location_id',
+    'category_id',
+    'author__username',
+)
 
 
 def get_posts(
     posts=Post.objects,
     *,
     filter_by_is_published=True,
-    count_comments=True,
     join_related=True,
 ):
     if join_related:
-        posts = posts.select_related('author', 'location', 'category')
+        posts = posts.select_related('author').only(*FEED_FIELDS)
     if filter_by_is_published:
         posts = posts.filter(
             is_published=True,
             category__is_published=True,
-            pub_date__lte=datetime.today()
-        )
-    if count_comments:
-        return posts.annotate(comment_count=Count('comments')).order_by(
-            '-pub_date'
+            pub_date__lte=visibility_now()
         )
-    return posts
+    return posts.order_by('-pub_date', '-id')
+
 
+def is_post_visible(post):
+    return (
+        post.is_published
+        and post.category is not None
+        and post.category.is_published
+        and post.pub_date <= visibility_now()
+    )
 
-class IndexListView(PostMixin, ListView):
+
+class IndexListView(PostListMixin, ListView):
     template_name = 'blog/index.html'
     paginate_by = POSTS_PER_PAGE
-    queryset = get_posts(Post.objects)
+
+    def get_queryset(self):
+        return get_posts(Post.objects)
+
+    def get_cache_scopes(self):
+        return FEED_SCOPE, REFS_SCOPE
 
 
-class PostDetailView(PostMixin, DetailView):
+class PostDetailView(
+    ConditionalGetMixin, AnonymousPageCacheMixin, PostMixin, DetailView
+):
     template_name = 'blog/detail.html'
 
+    def get_cache_scopes(self):
+        return post_scope(self.kwargs[self.pk_url_kwarg]), REFS_SCOPE
+
     def get_object(self):
         post = get_object_or_404(
-            Post.objects,
+            Post.objects.select_related('author', 'location', 'category'),
             id=self.kwargs.get(self.pk_url_kwarg)
         )
-        if self.request.user == post.author:
+        if self.request.user == post.author or is_post_visible(post):
             return post
-        return get_object_or_404(
-            get_posts(
-                Post.objects,
-                count_comments=False,
-                join_related=False
-            ),
-            id=self.kwargs.get(self.pk_url_kwarg)
-        )
+        raise Http404('Публикация не найдена.')
 
     def get_context_data(self, **kwargs):
         return super().get_context_data(
             **kwargs,
             form=CreateCommentForm(),
-            comments=self.object.comments.prefetch_related('author').all()
+            comments=self.get_comments(),
         )
 
+    def get_comments(self):
+        return keyset_paginate_ascending(
+            self.object.comments.select_related('author').only(
+                *COMMENT_FIELDS
+            ),
+            COMMENTS_PER_PAGE,
+            'created_at',
+            after=self.request.GET.get('after'),
+        )
+
+
+class CommentListView(PostDetailView):
+    template_name = 'includes/comment_list.html'
+
 
 class PostCreateView(LoginRequiredMixin, PostMixin, CreateView):
     form_class = CreatePostForm
@@ -93,9 +150,10 @@ class PostCreateView(LoginRequiredMixin, PostMixin, CreateView):
 class PostUpdateView(AuthorAccessMixin, PostMixin, UpdateView):
     form_class = CreatePostForm
     template_name = 'blog/create.html'
+    related_fields = ('author', 'category')
 
     def dispatch(self, request, *args, **kwargs):
-        if self.get_object().author != request.user:
+        if self.get_object().author_id != request.user.id:
             return redirect('blog:post_detail',
                             post_id=self.kwargs.get(self.pk_url_kwarg))
         return super().dispatch(request, *args, **kwargs)
@@ -109,32 +167,43 @@ class PostUpdateView(AuthorAccessMixin, PostMixin, UpdateView):
 class PostDeleteView(AuthorAccessMixin, PostMixin, DeleteView):
     template_name = 'blog/create.html'
     success_url = reverse_lazy('blog:index')
+    related_fields = ('author', 'category', 'location')
 
     def get_context_data(self, **kwargs):
         return super().get_context_data(
             **kwargs,
-            form=CreatePostForm(instance=self.get_object()),
+            form=CreatePostForm(instance=self.object),
         )
 
 
-class ProfileListView(PostMixin, ListView):
+class ProfileListView(PostListMixin, ListView):
     template_name = 'blog/profile.html'
     paginate_by = POSTS_PER_PAGE
 
-    def get_author(self):
+    @cached_property
+    def author(self):
         return get_object_or_404(User, username=self.kwargs['username'])
 
+    @cached_property
+    def is_public(self):
+        return self.request.user != self.author
+
     def get_queryset(self):
-        author = self.get_author()
         return get_posts(
-            author.posts.all(),
-            filter_by_is_published=self.request.user != author
+            self.author.posts.all(),
+            filter_by_is_published=self.is_public
         )
 
+    def get_cache_scopes(self):
+        return author_scope(self.kwargs['username']), REFS_SCOPE
+
+    def get_visibility(self):
+        return 'public' if self.is_public else 'all'
+
     def get_context_data(self, **kwargs):
         return super().get_context_data(
             **kwargs,
-            profile=self.get_author(),
+            profile=self.author,
         )
 
 
@@ -157,12 +226,13 @@ class ProfileUpdateView(LoginRequiredMixin, UpdateView):
         return self.request.user
 
 
-class CategoryListView(PostMixin, ListView):
+class CategoryListView(PostListMixin, ListView):
     model = Post
     template_name = 'blog/category.html'
     paginate_by = POSTS_PER_PAGE
 
-    def get_category(self):
+    @cached_property
+    def category(self):
         return get_object_or_404(
             Category,
             slug=self.kwargs['category_slug'],
@@ -170,18 +240,24 @@ class CategoryListView(PostMixin, ListView):
         )
 
     def get_queryset(self):
-        return get_posts(self.get_category().posts.all())
+        return get_posts(self.category.posts.all())
+
+    def get_cache_scopes(self):
+        return category_scope(self.kwargs['category_slug']), REFS_SCOPE
 
     def get_context_data(self, **kwargs):
         return super().get_context_data(
             **kwargs,
-            category=self.get_category()
+            category=self.category
         )
 
 
 class CommentCreateView(CommentChangeMixin, LoginRequiredMixin, CreateView):
     def form_valid(self, form):
-        form.instance.post = get_object_or_404(Post, pk=self.kwargs['post_id'])
+        form.instance.post = get_object_or_404(
+            Post.objects.select_related('author', 'category'),
+            pk=self.kwargs['post_id'],
+        )
         form.instance.author = self.request.user
         return super().form_valid(form)
 
@@ -0,0 +1,82 @@
+from http.cookies import SimpleCookie
+from io import BytesIO
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.urls import reverse
+
+
+def default_host():
+    """Первый точный адрес из ALLOWED_HOSTS, иначе localhost, который
+    Django принимает при включённом DEBUG."""
+    return next(
+        (
+            host for host in settings.ALLOWED_HOSTS
+            if host != '*' and not host.startswith('.')
+        ),
+        'localhost',
+    )
+
+
+class WSGIClient:
+    """Вызывает WSGI-приложение напрямую, без сокетов, и хранит cookies
+    между запросами, как браузер."""
+
+    def __init__(self, application, host):
+        self.application = application
+        self.host = host
+        self.cookies = SimpleCookie()
+
+    def request(self, method, path, data=None, csrf=False):
+        body = urlencode(data or {}).encode()
+        environ = {
+            'REQUEST_METHOD': method,
+            'PATH_INFO': path,
+            'QUERY_STRING': '',
+            'SERVER_NAME': self.host,
+            'SERVER_PORT': '80',
+            'SERVER_PROTOCOL': 'HTTP/1.1',
+            'REMOTE_ADDR': '10.0.0.1',
+            'HTTP_HOST': self.host,
+            'HTTP_COOKIE': '; '.join(
+                f'{name}={morsel.value}'
+                for name, morsel in self.cookies.items()
+            ),
+            'CONTENT_TYPE': 'application/x-www-form-urlencoded',
+            'CONTENT_LENGTH': str(len(body)),
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': 'http',
+            'wsgi.input': BytesIO(body),
+            'wsgi.errors': BytesIO(),
+            'wsgi.multithread': False,
+            'wsgi.multiprocess': True,
+            'wsgi.run_once': False,
+        }
+        if csrf and 'csrftoken' in self.cookies:
+            environ['HTTP_X_CSRFTOKEN'] = self.cookies['csrftoken'].value
+        status = []
+
+        def start_response(response_status, headers, exc_info=None):
+            status.append(int(response_status.split()[0]))
+            for name, value in headers:
+                if name.lower() == 'set-cookie':
+                    self.cookies.load(value)
+
+        response = self.application(environ, start_response)
+        try:
+            for _ in response:
+                pass
+        finally:
+            if hasattr(response, 'close'):
+                response.close()
+        return status[0]
+
+    def login(self, username, password):
+        path = reverse('login')
+        self.request('GET', path)
+        return self.request(
+            'POST',
+            path,
+            {'username': username, 'password': password},
+            csrf=True,
+        )
@@ -45,10 +45,10 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'django_bootstrap5',
-    'debug_toolbar',
 ]
 
 MIDDLEWARE = [
+    'blog.middleware.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -56,9 +56,12 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'debug_toolbar.middleware.DebugToolbarMiddleware',
 ]
 
+if DEBUG:
+    INSTALLED_APPS.append('debug_toolbar')
+    MIDDLEWARE.append('debug_toolbar.middleware.DebugToolbarMiddleware')
+
 INTERNAL_IPS = [
     '127.0.0.1',
 ]
@@ -95,6 +98,79 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+
+# Version counters, feed totals, anonymous pages and post cards are shared
+# by every worker process, so production needs a shared backend; memcached
+# bounds its own memory (memcached -m) and evicts least recently used keys.
+# The process-local cache only suits the single-process development server:
+# the blog.E001 check rejects it once DEBUG is off.
+if DEBUG:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'OPTIONS': {
+                'MAX_ENTRIES': 10_000,
+            },
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+            'LOCATION': os.environ.get('BLOGICUM_MEMCACHED', '127.0.0.1:11211'),
+        }
+    }
+
+# Scheduled posts become visible on the first tick of this clock (seconds)
+# after their pub_date; feed cache keys roll over on the same tick.
+VISIBILITY_CLOCK_BUCKET = 30
+
+# How long anonymous feed and post pages stay cached (seconds).
+PAGE_CACHE_TIMEOUT = 60
+
+# How long rendered post cards stay cached (seconds); cards are versioned,
+# so this only bounds memory held by stale versions.
+POST_CARD_CACHE_TIMEOUT = 60 * 60 * 24
+
+# How long a worker renders cards from its in-memory copy of categories and
+# locations (seconds) before rereading them, even if no change was seen.
+REFERENCE_CACHE_TIMEOUT = 60
+
+# Render feed pages from lightweight __slots__ read models instead of model
+# instances (see the bench_read_models command).
+FEED_READ_MODELS = False
+
+# Feed pagination: how long post totals are cached (seconds) and from how
+# many estimated feed rows PostgreSQL planner estimates replace exact counts.
+FEED_COUNT_CACHE_TIMEOUT = 60
+FEED_COUNT_ESTIMATE_THRESHOLD = 1_000_000
+
+
+# Logging
+# https://docs.djangoproject.com/en/3.2/topics/logging/
+
+# blog.timing writes one JSON line per request with the figures that
+# ServerTimingMiddleware also sends in the Server-Timing header.
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'blog.timing': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
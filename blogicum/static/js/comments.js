@@ -0,0 +1,14 @@
+// Подгружает следующую страницу комментариев без перезагрузки:
+// ссылка «Показать ещё комментарии» заменяется полученным фрагментом.
+document.addEventListener('click', function (event) {
+  var link = event.target.closest('[data-comments-more] a');
+  if (!link) {
+    return;
+  }
+  event.preventDefault();
+  fetch(link.dataset.fragmentUrl)
+    .then(function (response) { return response.text(); })
+    .then(function (html) {
+      link.parentElement.outerHTML = html;
+    });
+});
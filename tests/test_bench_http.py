@@ -0,0 +1,74 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models import Count, F
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_bench_http_reports_every_endpoint(
+        PostModel, CommentModel, django_user_model):
+    call_command(
+        "generate_load_data", users=3, categories=2, locations=2, posts=20,
+        comments=40, scheduled=0, unpublished=0, seed=1, stdout=StringIO(),
+    )
+    comments = CommentModel.objects.count()
+    stdout = StringIO()
+    call_command(
+        "bench_http", requests=60, warmup=0, seed=1, allow_writes=True,
+        mix="index=1,category=1,profile=1,detail=1,comment=1,login=1",
+        stdout=stdout, stderr=StringIO(),
+    )
+    report = json.loads(stdout.getvalue())
+    assert set(report["endpoints"]) == {
+        "index", "category", "profile", "detail", "comment", "login",
+    }
+    for name, endpoint in report["endpoints"].items():
+        expected = "302" if name in ("comment", "login") else "200"
+        assert set(endpoint["statuses"]) == {expected}, (
+            f"Запросы `{name}` нагрузочного замера завершились ошибкой: "
+            f"{endpoint['statuses']}"
+        )
+        assert endpoint["p50_ms"] <= endpoint["p95_ms"] <= endpoint["p99_ms"]
+    assert sum(
+        endpoint["requests"] for endpoint in report["endpoints"].values()
+    ) == 60
+    assert report["endpoints"]["comment"]["requests"] > 0
+    assert CommentModel.objects.count() == comments, (
+        "Убедитесь, что после замера комментарии нагрузочного теста "
+        "удаляются."
+    )
+    assert not django_user_model.objects.filter(
+        username__startswith="bench_http_"
+    ).exists(), "Убедитесь, что после замера удаляется его пользователь."
+    assert not PostModel.objects.annotate(
+        actual=Count("comments")
+    ).exclude(comment_count=F("actual")).exists()
+
+
+def test_bench_http_keeps_existing_accounts(
+        mixer, PostModel, django_user_model):
+    call_command(
+        "generate_load_data", users=2, categories=1, locations=1, posts=5,
+        comments=5, scheduled=0, unpublished=0, seed=1, stdout=StringIO(),
+    )
+    user = mixer.blend(django_user_model, username="bench_http")
+    mixer.blend("blog.Post", author=user)
+    users = set(django_user_model.objects.values_list("id", flat=True))
+    call_command(
+        "bench_http", requests=5, warmup=0, seed=1, allow_writes=True,
+        mix="comment=1", stdout=StringIO(), stderr=StringIO(),
+    )
+    assert set(
+        django_user_model.objects.values_list("id", flat=True)
+    ) == users, "Убедитесь, что замер удаляет только своего пользователя."
+    assert PostModel.objects.filter(author=user).exists()
+
+
+def test_bench_http_refuses_to_write_without_debug(django_user_model):
+    with pytest.raises(CommandError):
+        call_command("bench_http", stdout=StringIO(), stderr=StringIO())
+    assert not django_user_model.objects.exists()
@@ -0,0 +1,26 @@
+import pytest
+
+from blog.checks import check_shared_cache
+
+LOCMEM = "django.core.cache.backends.locmem.LocMemCache"
+MEMCACHED = "django.core.cache.backends.memcached.PyMemcacheCache"
+
+
+@pytest.mark.parametrize(
+    "debug, backend, errors",
+    [
+        (False, LOCMEM, ["blog.E001"]),
+        (True, LOCMEM, []),
+        (False, MEMCACHED, []),
+    ],
+)
+def test_process_local_cache_rejected_without_debug(
+        settings, debug, backend, errors):
+    settings.DEBUG = debug
+    settings.CACHES = {
+        "default": {"BACKEND": backend, "LOCATION": "127.0.0.1:11211"}
+    }
+    assert [error.id for error in check_shared_cache(None)] == errors, (
+        "Убедитесь, что без DEBUG проверка `blog.E001` не допускает кеш "
+        "в памяти одного процесса."
+    )
@@ -0,0 +1,99 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.db.models.signals import pre_delete
+from django.test.utils import CaptureQueriesContext
+from mixer.backend.django import Mixer
+
+from blog.versions import FEED_SCOPE, get_versions
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_comment_count_follows_comments(
+        mixer: Mixer, post_with_published_location, another_user):
+    post = post_with_published_location
+    comments = mixer.cycle(3).blend(
+        "blog.Comment", post=post, author=another_user
+    )
+    post.refresh_from_db()
+    assert post.comment_count == 3, (
+        "Убедитесь, что при создании комментария увеличивается счётчик "
+        "`comment_count` у публикации."
+    )
+    comments[0].delete()
+    post.refresh_from_db()
+    assert post.comment_count == 2, (
+        "Убедитесь, что при удалении комментария уменьшается счётчик "
+        "`comment_count` у публикации."
+    )
+    another_user.delete()
+    post.refresh_from_db()
+    assert post.comment_count == 0, (
+        "Убедитесь, что при каскадном удалении комментариев счётчик "
+        "`comment_count` у публикации обновляется."
+    )
+
+
+@pytest.mark.parametrize("comment_count", [1, 50])
+def test_post_delete_skips_per_comment_work(
+        mixer: Mixer, post_with_published_location, comment_count):
+    post = post_with_published_location
+    mixer.cycle(comment_count).blend("blog.Comment", post=post)
+    other = mixer.blend("blog.Comment", author=post.author)
+    with CaptureQueriesContext(connection) as queries:
+        post.delete()
+    assert len(queries) <= 5, (
+        "Убедитесь, что при удалении публикации её комментарии не "
+        "обновляют счётчик и версии по одному:\n"
+        + "\n".join(query["sql"] for query in queries)
+    )
+    other.delete()
+    other.post.refresh_from_db()
+    assert other.post.comment_count == 0, (
+        "Убедитесь, что после удаления публикации счётчик комментариев "
+        "других публикаций по-прежнему обновляется."
+    )
+
+
+def test_interrupted_post_delete_does_not_leak(
+        mixer: Mixer, post_with_published_location, PostModel):
+    post = post_with_published_location
+    comments = mixer.cycle(2).blend("blog.Comment", post=post)
+
+    def fail(sender, instance, **kwargs):
+        raise RuntimeError("delete failed")
+
+    pre_delete.connect(fail, sender=PostModel)
+    try:
+        with pytest.raises(RuntimeError), transaction.atomic():
+            post.delete()
+    finally:
+        pre_delete.disconnect(fail, sender=PostModel)
+    comments[0].delete()
+    post.refresh_from_db()
+    assert post.comment_count == 1, (
+        "Убедитесь, что после прерванного удаления публикации удаление её "
+        "комментариев по-прежнему обновляет счётчик."
+    )
+
+
+def test_rebuild_comment_counts(
+        mixer: Mixer, post_with_published_location, PostModel):
+    post = post_with_published_location
+    mixer.cycle(2).blend("blog.Comment", post=post)
+    PostModel.objects.update(comment_count=0)
+    before = get_versions(FEED_SCOPE)
+    call_command("rebuild_comment_counts", stdout=None)
+    post.refresh_from_db()
+    assert post.comment_count == 2, (
+        "Убедитесь, что команда `rebuild_comment_counts` пересчитывает "
+        "счётчик комментариев."
+    )
+    changed = get_versions(FEED_SCOPE)
+    assert changed > before, (
+        "Убедитесь, что `rebuild_comment_counts` сбрасывает кеш ленты, "
+        "если счётчики изменились."
+    )
+    call_command("rebuild_comment_counts", stdout=None)
+    assert get_versions(FEED_SCOPE) == changed
@@ -0,0 +1,70 @@
+import pytest
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from mixer.backend.django import Mixer
+
+from blog import versions
+
+pytestmark = [pytest.mark.django_db]
+
+URLS = [
+    "/", "/posts/{post.id}/", "/profile/{post.author.username}/",
+    "/category/{post.category.slug}/",
+]
+
+
+@pytest.mark.parametrize("url", URLS)
+@pytest.mark.parametrize("client_name", ["client", "user_client"])
+def test_unchanged_page_returns_not_modified(
+        request, client_name, post_with_published_location, url):
+    client: Client = request.getfixturevalue(client_name)
+    url = url.format(post=post_with_published_location)
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.has_header("ETag") and response.has_header(
+        "Last-Modified"
+    ), "Убедитесь, что страницы отдаются с заголовками ETag и Last-Modified."
+    with CaptureQueriesContext(connection) as queries:
+        not_modified = client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+    assert not_modified.status_code == 304, (
+        "Убедитесь, что неизменившаяся страница отдаётся с кодом 304."
+    )
+    assert not any("blog_" in query["sql"] for query in queries), (
+        "Убедитесь, что ответ 304 формируется без запросов к таблицам блога."
+    )
+    not_modified = client.get(
+        url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+    )
+    assert not_modified.status_code == 304
+
+
+def test_validators_change_with_content(
+        mixer: Mixer, client: Client, user_client: Client,
+        post_with_published_location, monkeypatch):
+    post = post_with_published_location
+    url = f"/posts/{post.id}/"
+    first = client.get(url)
+    etag = first["ETag"]
+    assert user_client.get(url)["ETag"] != etag, (
+        "Убедитесь, что ETag зависит от пользователя."
+    )
+    # Last-Modified точен до секунды: комментарий пишется позже.
+    later = versions.now_version() + 2000
+    monkeypatch.setattr(versions, "now_version", lambda: later)
+    mixer.blend("blog.Comment", post=post, text="New comment")
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200, (
+        "Убедитесь, что после нового комментария страница публикации "
+        "отдаётся заново."
+    )
+    assert "New comment" in response.content.decode("utf-8")
+    response = client.get(
+        url, HTTP_IF_MODIFIED_SINCE=first["Last-Modified"]
+    )
+    assert response.status_code == 200, (
+        "Убедитесь, что после нового комментария `Last-Modified` страницы "
+        "публикации меняется и запрос с `If-Modified-Since` получает её "
+        "заново."
+    )
+    assert response["Last-Modified"] != first["Last-Modified"]
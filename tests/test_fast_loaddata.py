@@ -0,0 +1,122 @@
+import gzip
+import json
+from io import StringIO
+
+import pytest
+from django.conf import settings
+from django.contrib.auth.models import Group
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models import Count, F
+
+pytestmark = [pytest.mark.django_db]
+
+DERIVED_FIELDS = ("text_html", "excerpt", "comment_count")
+
+
+@pytest.fixture
+def fixture_path(tmp_path, django_user_model, PostModel):
+    """Фикстура в формате db.json: без полей, которые готовятся при
+    сохранении, и с группой пользователя для проверки m2m."""
+    call_command(
+        "generate_load_data", users=4, categories=2, locations=2, posts=30,
+        comments=120, scheduled=0, unpublished=0, seed=2, stdout=StringIO(),
+    )
+    group = Group.objects.create(name="Авторы")
+    group.user_set.add(*django_user_model.objects.all()[:2])
+    full_path = tmp_path / "full.json"
+    call_command(
+        "dumpdata", "auth.group", "auth.user", "blog", output=str(full_path),
+        indent=2,
+    )
+    objects = json.loads(full_path.read_text(encoding="utf-8"))
+    for item in objects:
+        if item["model"] == "blog.post":
+            for name in DERIVED_FIELDS:
+                del item["fields"][name]
+    path = tmp_path / "dump.json"
+    path.write_text(
+        json.dumps(objects, ensure_ascii=False, indent=2), encoding="utf-8"
+    )
+    # dumpdata хранит время с точностью до миллисекунд.
+    expected = {
+        post.id: (
+            post.excerpt,
+            post.created_at.replace(
+                microsecond=post.created_at.microsecond // 1000 * 1000
+            ),
+            post.comment_count,
+        )
+        for post in PostModel.objects.all()
+    }
+    django_user_model.objects.all().delete()
+    Group.objects.all().delete()
+    return path, expected
+
+
+@pytest.mark.parametrize("batch_size, chunk_size", [(500, 65536), (7, 50)])
+def test_fast_loaddata(
+        fixture_path, batch_size, chunk_size, django_user_model, PostModel,
+        CommentModel):
+    path, expected = fixture_path
+    stdout = StringIO()
+    call_command(
+        "fast_loaddata", str(path), batch_size=batch_size,
+        chunk_size=chunk_size, stdout=stdout,
+    )
+    assert "Загружено объектов" in stdout.getvalue()
+    assert CommentModel.objects.count() == 120
+    loaded = {
+        post.id: (post.excerpt, post.created_at, post.comment_count)
+        for post in PostModel.objects.all()
+    }
+    assert loaded == expected, (
+        "Убедитесь, что `fast_loaddata` сохраняет даты из фикстуры, "
+        "готовит HTML текста и пересчитывает `comment_count`."
+    )
+    assert django_user_model.objects.filter(groups__name="Авторы").count() == 2
+
+    call_command("fast_loaddata", str(path), stdout=StringIO())
+    assert PostModel.objects.count() == len(expected)
+    assert not PostModel.objects.annotate(
+        actual=Count("comments")
+    ).exclude(comment_count=F("actual")).exists()
+    assert django_user_model.objects.filter(groups__name="Авторы").count() == 2
+
+
+def test_fast_loaddata_reads_compressed_fixture(fixture_path, PostModel):
+    path, expected = fixture_path
+    compressed = path.with_suffix(".json.gz")
+    compressed.write_bytes(gzip.compress(path.read_bytes()))
+    call_command("fast_loaddata", str(compressed), stdout=StringIO())
+    assert PostModel.objects.count() == len(expected)
+
+
+def test_fast_loaddata_rejects_broken_fixture(tmp_path, PostModel):
+    path = tmp_path / "broken.json"
+    path.write_text('[{"model": "blog.location", "pk": 1, "fields": {}}, ')
+    with pytest.raises(CommandError):
+        call_command("fast_loaddata", str(path), stdout=StringIO())
+
+
+def test_bench_loaddata_keeps_database(fixture_path, PostModel):
+    path, expected = fixture_path
+    call_command("fast_loaddata", str(path), stdout=StringIO())
+    stdout = StringIO()
+    call_command("bench_loaddata", str(path), stdout=stdout)
+    assert "loaddata" in stdout.getvalue()
+    assert "fast_loaddata" in stdout.getvalue()
+    assert PostModel.objects.count() == len(expected)
+
+
+@pytest.mark.parametrize("command", ["loaddata", "fast_loaddata"])
+@pytest.mark.parametrize(
+    "path",
+    [settings.BASE_DIR / "db.json", settings.BASE_DIR.parent / "db.json"],
+)
+def test_project_fixtures_load(command, path, PostModel):
+    call_command(command, str(path), stdout=StringIO())
+    assert PostModel.objects.exists(), (
+        f"Убедитесь, что фикстура `{path.name}` загружается командой "
+        f"`{command}`."
+    )
@@ -0,0 +1,37 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db.models import Count, F
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_generate_load_data(PostModel, CommentModel):
+    call_command(
+        "generate_load_data", users=5, categories=2, locations=2, posts=60,
+        comments=300, scheduled=0.2, unpublished=0.2, batch_size=25, seed=1,
+        stdout=StringIO(),
+    )
+    assert PostModel.objects.count() == 60
+    assert CommentModel.objects.count() == 300
+    mismatched = PostModel.objects.annotate(
+        actual=Count("comments")
+    ).exclude(comment_count=F("actual"))
+    assert not mismatched.exists(), (
+        "Убедитесь, что `generate_load_data` заполняет `comment_count` "
+        "в соответствии с созданными комментариями."
+    )
+    hidden = PostModel.objects.filter(is_published=False) | (
+        PostModel.objects.filter(pub_date__gt=timezone.now())
+    )
+    assert hidden.exists()
+    assert not CommentModel.objects.filter(post__in=hidden).exists()
+    assert not PostModel.objects.filter(excerpt="").exists(), (
+        "Убедитесь, что у созданных публикаций подготовлен HTML текста."
+    )
+    assert not CommentModel.objects.filter(
+        created_at__lt=timezone.now() - timedelta(days=3 * 366)
+    ).exists()
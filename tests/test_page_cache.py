@@ -0,0 +1,134 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import Client
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from blog import clock
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.mark.parametrize(
+    "url", ["/", "/posts/{post.id}/", "/profile/{post.author.username}/",
+            "/category/{post.category.slug}/"]
+)
+def test_anonymous_page_served_from_cache(
+        client: Client, post_with_published_location,
+        django_assert_num_queries, url):
+    url = url.format(post=post_with_published_location)
+    first = client.get(url)
+    with django_assert_num_queries(0):
+        second = client.get(url)
+    assert second.content == first.content, (
+        "Убедитесь, что анонимному пользователю страница отдаётся из кеша "
+        "без запросов к базе данных."
+    )
+
+
+def test_page_cache_invalidated_by_comment(
+        mixer: Mixer, client: Client, post_with_published_location):
+    url = f"/posts/{post_with_published_location.id}/"
+    client.get(url)
+    mixer.blend(
+        "blog.Comment", post=post_with_published_location, text="New comment"
+    )
+    assert "New comment" in client.get(url).content.decode("utf-8"), (
+        "Убедитесь, что кеш страницы публикации сбрасывается при "
+        "добавлении комментария."
+    )
+
+
+def test_page_cache_bypassed_for_authenticated(
+        user_client: Client, client: Client, post_with_published_location):
+    client.get("/")
+    response = user_client.get("/")
+    assert response.context is not None, (
+        "Убедитесь, что авторизованному пользователю страница не отдаётся "
+        "из кеша анонимных страниц."
+    )
+
+
+def test_post_cards_rendered_from_cache(
+        user_client: Client, post_with_published_location):
+    first = user_client.get("/")
+    assert "includes/post_card.html" in [t.name for t in first.templates]
+    second = user_client.get("/")
+    assert "includes/post_card.html" not in [
+        t.name for t in second.templates
+    ], (
+        "Убедитесь, что карточки публикаций берутся из кеша фрагментов."
+    )
+    post_with_published_location.title = "Edited title"
+    post_with_published_location.save()
+    assert "Edited title" in user_client.get("/").content.decode("utf-8"), (
+        "Убедитесь, что кеш карточки публикации сбрасывается при её "
+        "редактировании."
+    )
+
+
+def test_scheduled_post_appears_when_clock_ticks(
+        mixer: Mixer, client: Client, monkeypatch, published_category):
+    now = timezone.now()
+    mixer.blend(
+        "blog.Post",
+        title="Scheduled post",
+        is_published=True,
+        category=published_category,
+        pub_date=now + timedelta(minutes=1),
+    )
+    assert "Scheduled post" not in client.get("/").content.decode("utf-8")
+    monkeypatch.setattr(
+        clock.timezone, "now", lambda: now + timedelta(minutes=2)
+    )
+    assert "Scheduled post" in client.get("/").content.decode("utf-8"), (
+        "Убедитесь, что отложенная публикация появляется в ленте после "
+        "наступления даты публикации, в том числе для закешированной "
+        "страницы."
+    )
+
+
+def test_publish_scheduled_warms_feed(
+        mixer: Mixer, client: Client, published_category,
+        django_assert_num_queries):
+    mixer.blend(
+        "blog.Post",
+        title="Just published",
+        is_published=True,
+        category=published_category,
+        pub_date=clock.visibility_now() - timedelta(seconds=1),
+    )
+    call_command(
+        "publish_scheduled", "--once", host="testserver",
+        stdout=StringIO(), stderr=StringIO(),
+    )
+    with django_assert_num_queries(0):
+        content = client.get("/").content.decode("utf-8")
+    assert "Just published" in content, (
+        "Убедитесь, что команда `publish_scheduled` прогревает кеш ленты "
+        "вышедшими публикациями."
+    )
+
+
+def test_publish_scheduled_fails_when_pages_not_warmed(
+        mixer: Mixer, published_category):
+    mixer.blend(
+        "blog.Post",
+        is_published=True,
+        category=published_category,
+        pub_date=clock.visibility_now() - timedelta(seconds=1),
+    )
+    stderr = StringIO()
+    with pytest.raises(CommandError):
+        call_command(
+            "publish_scheduled", "--once", host="unknown.example",
+            stdout=StringIO(), stderr=stderr,
+        )
+    assert "ответила 400" in stderr.getvalue(), (
+        "Убедитесь, что команда `publish_scheduled` сообщает о страницах, "
+        "которые не удалось прогреть."
+    )
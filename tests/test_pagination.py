@@ -0,0 +1,145 @@
+import re
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.pagination import encode_cursor
+from blog.versions import VERSION_KEY, category_scope
+from blog.views import IndexListView
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_keyset_pages_follow_offset_order(
+        client: Client, many_posts_with_published_locations):
+    expected = [
+        post.id for post in client.get("/").context["paginator"].object_list
+    ]
+    assert client.get("/?after=").status_code == 404, (
+        "Убедитесь, что при неверном курсоре возвращается ошибка 404."
+    )
+    response = client.get("/?page=1")
+    last_on_page = response.context["page_obj"][N_PER_PAGE - 1]
+    response = client.get(f"/?after={encode_cursor(last_on_page)}")
+    page = response.context["page_obj"]
+    assert [post.id for post in page] == expected[N_PER_PAGE:], (
+        "Убедитесь, что страница по курсору `after` продолжает ленту "
+        "с того места, где закончилась предыдущая страница."
+    )
+    assert page.has_previous() and not page.has_next()
+
+    response = client.get(f"/?before={page.previous_cursor}")
+    assert [
+        post.id for post in response.context["page_obj"]
+    ] == expected[:N_PER_PAGE], (
+        "Убедитесь, что страница по курсору `before` возвращает "
+        "предыдущие публикации в порядке ленты."
+    )
+
+
+def test_feed_count_is_cached_and_invalidated(
+        client: Client, mixer, many_posts_with_published_locations,
+        published_category):
+    assert client.get("/").context["paginator"].count == N_PER_PAGE * 2
+    with CaptureQueriesContext(connection) as queries:
+        client.get("/")
+    assert not any("COUNT(" in query["sql"] for query in queries), (
+        "Убедитесь, что количество публикаций в ленте кешируется."
+    )
+    mixer.blend(
+        "blog.Post",
+        category=published_category,
+        is_published=True,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+    assert client.get("/").context["paginator"].count == N_PER_PAGE * 2 + 1, (
+        "Убедитесь, что кеш количества публикаций сбрасывается при "
+        "добавлении публикации."
+    )
+
+
+def test_feed_count_is_cached_per_category(
+        client: Client, mixer, many_posts_with_published_locations,
+        published_category, another_category):
+    mixer.blend(
+        "blog.Post",
+        category=another_category,
+        is_published=True,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+    for category in (published_category, another_category):
+        cache.set(VERSION_KEY.format(category_scope(category.slug)), 1, None)
+    first = client.get(f"/category/{published_category.slug}/")
+    assert first.context["paginator"].count == N_PER_PAGE * 2
+    second = client.get(f"/category/{another_category.slug}/")
+    assert second.context["paginator"].count == 1, (
+        "Убедитесь, что количество публикаций кешируется отдельно для "
+        "каждой категории, даже при совпадающих версиях."
+    )
+
+
+def test_paginator_renders_elided_page_range(
+        client: Client, monkeypatch, many_posts_with_published_locations):
+    monkeypatch.setattr(IndexListView, "paginate_by", 1)
+    content = client.get("/?page=10").content.decode("utf-8")
+    page_links = re.findall(r'href="\?page=\d+"', content)
+    assert "…" in content and len(page_links) < 12, (
+        "Убедитесь, что пагинатор выводит сокращённый список страниц, "
+        "а не ссылку на каждую страницу ленты."
+    )
+
+
+def test_comments_are_paginated_by_keyset(
+        client: Client, mixer, post_with_published_location, CommentModel):
+    post = post_with_published_location
+    comments = mixer.cycle(25).blend("blog.Comment", post=post)
+    CommentModel.objects.filter(
+        id__in=[comment.id for comment in comments[5:15]]
+    ).update(created_at=comments[5].created_at)
+    expected = [comment.id for comment in comments]
+    response = client.get(f"/posts/{post.id}/")
+    page = response.context["comments"]
+    assert [comment.id for comment in page] == expected[:10], (
+        "Убедитесь, что на странице публикации выводится только первая "
+        "страница комментариев в порядке их создания."
+    )
+    assert page.has_next()
+    seen = [comment.id for comment in page]
+    while page.has_next():
+        response = client.get(
+            f"/posts/{post.id}/comments/?after={page.next_cursor}"
+        )
+        assert response.status_code == 200
+        assert "Оставить комментарий" not in response.content.decode()
+        page = response.context["comments"]
+        seen += [comment.id for comment in page]
+    assert seen == expected, (
+        "Убедитесь, что подгружаемые страницы комментариев продолжают "
+        "список без пропусков и повторов."
+    )
+    assert client.get(
+        f"/posts/{post.id}/comments/?after=bad"
+    ).status_code == 404
+
+
+def test_comment_pages_without_js_link_back(
+        client: Client, mixer, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(15).blend("blog.Comment", post=post)
+    first = client.get(f"/posts/{post.id}/")
+    assert "<script>" not in first.content.decode(), (
+        "Убедитесь, что скрипт подгрузки комментариев вынесен в "
+        "статический файл."
+    )
+    cursor = first.context["comments"].next_cursor
+    content = client.get(f"/posts/{post.id}/?after={cursor}").content
+    assert f'href="/posts/{post.id}/"' in content.decode(), (
+        "Убедитесь, что на следующей странице комментариев есть ссылка "
+        "на их начало."
+    )
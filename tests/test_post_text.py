@@ -0,0 +1,52 @@
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+from django.template import Context, Template
+
+pytestmark = [pytest.mark.django_db]
+
+
+def render_filters(text):
+    template = Template(
+        "{{ text|linebreaksbr }}|{{ text|linebreaks|truncatewords:10 }}"
+    )
+    return template.render(Context({"text": text})).split("|")
+
+
+def test_post_save_renders_text(post_with_published_location):
+    post = post_with_published_location
+    post.text = "Первая <строка>\nвторая строка\n\n" + "слово " * 20
+    post.save()
+    post.refresh_from_db()
+    assert [post.text_html, post.excerpt] == render_filters(post.text), (
+        "Убедитесь, что при сохранении публикации поля `text_html` и "
+        "`excerpt` совпадают с результатом фильтров шаблона."
+    )
+    post.text = "Новый текст"
+    post.save(update_fields=["text"])
+    post.refresh_from_db()
+    assert post.text_html == "Новый текст", (
+        "Убедитесь, что `text_html` обновляется и при сохранении "
+        "с `update_fields`."
+    )
+
+
+def test_rebuild_post_text(post_with_published_location, PostModel):
+    post = post_with_published_location
+    PostModel.objects.update(text="Обновлённый\nтекст")
+    call_command("rebuild_post_text", stdout=None)
+    post.refresh_from_db()
+    assert [post.text_html, post.excerpt] == render_filters(post.text), (
+        "Убедитесь, что команда `rebuild_post_text` заново готовит "
+        "HTML текста публикаций."
+    )
+
+
+def test_loaddata_renders_text(PostModel):
+    call_command("loaddata", settings.BASE_DIR / "db.json", stdout=None)
+    post = PostModel.objects.order_by("id").first()
+    assert [post.text_html, post.excerpt] == render_filters(post.text), (
+        "Убедитесь, что после `loaddata` у публикаций из фикстуры готовы "
+        "поля `text_html` и `excerpt`."
+    )
+    assert not PostModel.objects.filter(excerpt="").exists()
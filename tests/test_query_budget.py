@@ -0,0 +1,136 @@
+import pytest
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from mixer.backend.django import Mixer
+
+from blog.models import Category
+
+pytestmark = [pytest.mark.django_db]
+
+# session + user for logged-in clients; post; comments with authors.
+DETAIL_QUERIES = {"user_client": 4, "another_user_client": 4, "client": 2}
+
+
+def count_post_queries(queries) -> int:
+    return sum('FROM "blog_post"' in query["sql"] for query in queries)
+
+
+@pytest.mark.parametrize("comment_count", [0, 1, 500])
+@pytest.mark.parametrize("client_name", list(DETAIL_QUERIES))
+def test_post_detail_query_budget(
+        request, client_name, comment_count, mixer: Mixer,
+        post_with_published_location):
+    client: Client = request.getfixturevalue(client_name)
+    mixer.cycle(comment_count).blend(
+        "blog.Comment", post=post_with_published_location
+    )
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(f"/posts/{post_with_published_location.id}/")
+    assert response.status_code == 200
+    assert count_post_queries(queries) == 1, (
+        "Убедитесь, что страница публикации загружает публикацию "
+        "одним запросом."
+    )
+    assert len(queries) == DETAIL_QUERIES[client_name], (
+        "Убедитесь, что число запросов на странице публикации не "
+        f"превышает {DETAIL_QUERIES[client_name]}:\n"
+        + "\n".join(query["sql"] for query in queries)
+    )
+    comment_queries = [
+        query["sql"] for query in queries
+        if 'FROM "blog_comment"' in query["sql"]
+    ]
+    assert len(comment_queries) == 1
+    assert '"auth_user"."password"' not in comment_queries[0], (
+        "Убедитесь, что комментарии загружаются вместе с именами авторов "
+        "одним узким запросом."
+    )
+
+
+# Totals include the session and user lookups of the logged-in author.
+EDIT_QUERIES = [
+    ("get", "/posts/{post.id}/edit/", None, '"blog_post"."title"', 5),
+    ("post", "/posts/{post.id}/edit/", "post_form", '"blog_post"."title"', 7),
+    ("get", "/posts/{post.id}/delete/", None, '"blog_post"."title"', 3),
+    ("post", "/posts/{post.id}/delete/", {}, '"blog_post"."title"', 6),
+    ("get", "/posts/{post.id}/edit_comment/{comment.id}/", None,
+     '"blog_comment"."text"', 3),
+    ("post", "/posts/{post.id}/edit_comment/{comment.id}/", {"text": "new"},
+     '"blog_comment"."text"', 5),
+    ("get", "/posts/{post.id}/delete_comment/{comment.id}/", None,
+     '"blog_comment"."text"', 3),
+    ("post", "/posts/{post.id}/delete_comment/{comment.id}/", {},
+     '"blog_comment"."text"', 5),
+]
+
+
+@pytest.mark.parametrize(
+    "method, url, data, object_marker, expected", EDIT_QUERIES,
+    ids=[f"{item[0]} {item[1]}" for item in EDIT_QUERIES]
+)
+def test_edit_and_delete_query_budget(
+        user_client: Client, mixer: Mixer, user, post_with_published_location,
+        method, url, data, object_marker, expected):
+    post = post_with_published_location
+    comment = mixer.blend("blog.Comment", post=post, author=user)
+    if data == "post_form":
+        data = {
+            "title": "Edited", "text": "Edited", "category": post.category_id,
+            "pub_date": "2020-01-01T10:00",
+        }
+    url = url.format(post=post, comment=comment)
+    with CaptureQueriesContext(connection) as queries:
+        response = getattr(user_client, method)(url, data)
+    assert response.status_code in (200, 302)
+    object_queries = [
+        query for query in queries
+        if query["sql"].startswith("SELECT") and object_marker in query["sql"]
+    ]
+    assert len(object_queries) == 1, (
+        f"Убедитесь, что `{url}` загружает объект одним запросом."
+    )
+    assert len(queries) == expected, (
+        f"Убедитесь, что число запросов для `{method.upper()} {url}` не "
+        f"превышает {expected}:\n"
+        + "\n".join(query["sql"] for query in queries)
+    )
+
+
+def test_profile_resolves_author_once(
+        another_user_client: Client, post_with_published_location):
+    username = post_with_published_location.author.username
+    with CaptureQueriesContext(connection) as queries:
+        another_user_client.get(f"/profile/{username}/")
+    author_queries = [
+        query for query in queries
+        if query["sql"].startswith('SELECT "auth_user"')
+        and '"auth_user"."username" =' in query["sql"]
+    ]
+    assert len(author_queries) == 1, (
+        "Убедитесь, что автор на странице профиля загружается одним "
+        "запросом."
+    )
+
+
+def test_category_visibility_checked_in_sql(
+        client: Client, another_user_client: Client,
+        post_with_published_location):
+    post = post_with_published_location
+    another_user_client.get("/")
+    # update() не вызывает сигналов: копия справочников в памяти процесса
+    # и версии в кеше остаются прежними.
+    Category.objects.filter(pk=post.category_id).update(
+        is_published=False
+    )
+    assert post.title not in another_user_client.get("/").content.decode(
+        "utf-8"
+    ), (
+        "Убедитесь, что видимость публикаций в ленте проверяется в SQL, "
+        "а не по копии категорий в памяти процесса."
+    )
+    response = client.get(f"/category/{post.category.slug}/")
+    assert response.status_code == 404, (
+        "Убедитесь, что категория страницы ищется в базе данных с учётом "
+        "`is_published`."
+    )
@@ -0,0 +1,27 @@
+import pytest
+from django.core.cache import cache
+from django.test import Client, override_settings
+
+from blog.read_models import PostCard
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.mark.parametrize("query", ["", "?after=9999999999999999,1"])
+def test_read_models_render_same_feed(
+        user_client: Client, user, post_with_published_location,
+        many_posts_with_published_locations, query):
+    urls = ["/", f"/profile/{user.username}/",
+            f"/category/{post_with_published_location.category.slug}/"]
+    for url in urls:
+        url += query
+        orm_content = user_client.get(url).content
+        cache.clear()
+        with override_settings(FEED_READ_MODELS=True):
+            response = user_client.get(url)
+        cache.clear()
+        assert isinstance(response.context["page_obj"][0], PostCard)
+        assert response.content == orm_content, (
+            f"Убедитесь, что страница `{url}` из моделей чтения совпадает "
+            "со страницей из моделей ORM."
+        )
@@ -0,0 +1,47 @@
+import json
+import logging
+import re
+
+import pytest
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+
+def parse_server_timing(header):
+    return {
+        name: dict(re.findall(r'(\w+)=("[^"]*"|[\d.]+)', params))
+        for name, params in re.findall(r'(\w+);([^,]*)', header)
+    }
+
+
+def test_server_timing_reports_queries_and_cache(
+        client: Client, post_with_published_location, caplog):
+    logger = logging.getLogger("blog.timing")
+    logger.addHandler(caplog.handler)
+    try:
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get("/")
+    finally:
+        logger.removeHandler(caplog.handler)
+    timing = parse_server_timing(response["Server-Timing"])
+    assert timing["db"]["desc"] == f'"{len(queries)} queries"', (
+        "Убедитесь, что заголовок Server-Timing содержит число запросов "
+        "к базе данных."
+    )
+    assert float(timing["tpl"]["dur"]) > 0, (
+        "Убедитесь, что Server-Timing содержит время отрисовки шаблона."
+    )
+    assert "miss=" in timing["cache"]["desc"]
+    record = json.loads(caplog.records[-1].getMessage())
+    assert record["path"] == "/" and record["queries"] == len(queries), (
+        "Убедитесь, что для каждого запроса пишется строка журнала в JSON."
+    )
+
+    timing = parse_server_timing(client.get("/")["Server-Timing"])
+    assert timing["cache"]["desc"] == '"hit=1 miss=0"', (
+        "Убедитесь, что попадание в кеш страниц отражается в Server-Timing."
+    )
+    assert timing["db"]["desc"] == '"0 queries"'
@@ -0,0 +1,89 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.template import Context, Template
+from django.test.utils import CaptureQueriesContext
+
+from blog.versions import (
+    VERSION_KEY, bump_versions, get_versions, post_scope
+)
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_versions_are_monotonic_per_scope():
+    before = get_versions("feed", post_scope(1), post_scope(2))
+    assert get_versions("feed", post_scope(1), post_scope(2)) == before
+    bump_versions(post_scope(1))
+    feed, first, second = get_versions("feed", post_scope(1), post_scope(2))
+    assert first > before[1], (
+        "Убедитесь, что версия области растёт при каждом изменении."
+    )
+    assert (feed, second) == (before[0], before[2]), (
+        "Убедитесь, что изменение одной области не затрагивает другие."
+    )
+
+
+def test_bump_versions_recreates_evicted_version():
+    (before,) = get_versions(post_scope(1))
+    cache.delete(VERSION_KEY.format(post_scope(1)))
+    bump_versions(post_scope(1))
+    bump_versions(post_scope(1))
+    (after,) = get_versions(post_scope(1))
+    assert after > before, (
+        "Убедитесь, что вытесненная из кеша версия создаётся заново "
+        "больше прежней."
+    )
+
+
+def test_post_save_bumps_versions_again_after_commit(
+        post_with_published_location, django_capture_on_commit_callbacks):
+    post = post_with_published_location
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        post.title = "Changed"
+        post.save()
+        (in_transaction,) = get_versions(post_scope(post.id))
+    (committed,) = get_versions(post_scope(post.id))
+    assert callbacks and committed > in_transaction, (
+        "Убедитесь, что версии публикации сбрасываются ещё раз после "
+        "фиксации транзакции."
+    )
+
+
+def test_content_version_tag_keys_fragment_cache(
+        mixer, post_with_published_location):
+    post = post_with_published_location
+    template = Template(
+        "{% load cache blog_versions %}"
+        "{% content_version 'refs' post=post.id as version %}"
+        "{% cache 600 post_title post.id version %}{{ post.title }}"
+        "{% endcache %}"
+    )
+    assert template.render(Context({"post": post})) == post.title
+    title = post.title
+    post.title = "Changed"
+    assert template.render(Context({"post": post})) == title, (
+        "Убедитесь, что фрагмент берётся из кеша, пока версия не изменилась."
+    )
+    mixer.blend("blog.Comment", post=post)
+    assert template.render(Context({"post": post})) == "Changed", (
+        "Убедитесь, что версия из `content_version` меняется вместе "
+        "с содержимым."
+    )
+
+
+def test_deleting_author_posts_loads_scopes_once_per_post(
+        mixer, published_category, django_user_model):
+    queries = []
+    for posts in (1, 20):
+        author = mixer.blend(django_user_model)
+        mixer.cycle(posts).blend(
+            "blog.Post", author=author, category=published_category
+        )
+        with CaptureQueriesContext(connection) as captured:
+            author.delete()
+        queries.append(len(captured))
+    assert queries[1] - queries[0] <= 19, (
+        "Убедитесь, что при удалении публикаций их автор и категория "
+        "для сброса версий читаются одним запросом на публикацию."
+    )
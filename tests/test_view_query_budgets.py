@@ -0,0 +1,217 @@
+import re
+from collections import Counter
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth.tokens import default_token_generator
+from django.db import connection
+from django.db.backends.utils import CursorWrapper
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, reverse
+from django.utils import timezone
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+from mixer.backend.django import Mixer
+
+from authorization import urls as authorization_urls
+from blog import urls as blog_urls
+from pages import urls as pages_urls
+
+pytestmark = [pytest.mark.django_db]
+
+URL_MODULES = (blog_urls, pages_urls, authorization_urls)
+CLIENTS = ("anonymous", "author", "other")
+
+# Max queries and max rows fetched per named URL, for anonymous, author and
+# other-user clients, against the data seeded by `seeded`. The author owns
+# the post and comment in the URL; sessions and user lookups are counted.
+BUDGETS = {
+    "authorization:login": {
+        "anonymous": (0, 0), "author": (2, 2), "other": (2, 2),
+    },
+    "authorization:logout": {
+        "anonymous": (0, 0), "author": (4, 3), "other": (4, 3),
+    },
+    "authorization:password_change": {
+        "anonymous": (0, 0), "author": (2, 2), "other": (2, 2),
+    },
+    "authorization:password_change_done": {
+        "anonymous": (0, 0), "author": (2, 2), "other": (2, 2),
+    },
+    "authorization:password_reset": {
+        "anonymous": (0, 0), "author": (2, 2), "other": (2, 2),
+    },
+    "authorization:password_reset_done": {
+        "anonymous": (0, 0), "author": (2, 2), "other": (2, 2),
+    },
+    "authorization:password_reset_confirm": {
+        "anonymous": (5, 1), "author": (5, 2), "other": (5, 2),
+    },
+    "authorization:password_reset_complete": {
+        "anonymous": (0, 0), "author": (2, 2), "other": (2, 2),
+    },
+    "authorization:registration": {
+        "anonymous": (0, 0), "author": (2, 2), "other": (2, 2),
+    },
+    "blog:index": {
+        "anonymous": (4, 17), "author": (6, 19), "other": (6, 19),
+    },
+    "blog:post_detail": {
+        "anonymous": (2, 12), "author": (4, 14), "other": (4, 14),
+    },
+    "blog:comments": {
+        "anonymous": (2, 12), "author": (4, 14), "other": (4, 14),
+    },
+    "blog:create_post": {
+        "anonymous": (0, 0), "author": (4, 8), "other": (4, 8),
+    },
+    "blog:edit_post": {
+        "anonymous": (1, 1), "author": (5, 9), "other": (3, 3),
+    },
+    "blog:delete_post": {
+        "anonymous": (1, 1), "author": (3, 3), "other": (3, 3),
+    },
+    "blog:profile": {
+        "anonymous": (5, 17), "author": (7, 20), "other": (7, 19),
+    },
+    "blog:category_posts": {
+        "anonymous": (5, 16), "author": (7, 18), "other": (7, 18),
+    },
+    "blog:add_comment": {
+        "anonymous": (0, 0), "author": (2, 2), "other": (2, 2),
+    },
+    "blog:edit_comment": {
+        "anonymous": (1, 1), "author": (3, 3), "other": (3, 3),
+    },
+    "blog:delete_comment": {
+        "anonymous": (1, 1), "author": (3, 3), "other": (3, 3),
+    },
+    "blog:edit_profile": {
+        "anonymous": (0, 0), "author": (2, 2), "other": (2, 2),
+    },
+    "pages:about": {
+        "anonymous": (0, 0), "author": (2, 2), "other": (2, 2),
+    },
+    "pages:rules": {
+        "anonymous": (0, 0), "author": (2, 2), "other": (2, 2),
+    },
+}
+
+
+def iter_url_names(patterns, namespace):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from iter_url_names(pattern.url_patterns, namespace)
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            yield f"{namespace}:{pattern.name}", list(
+                pattern.pattern.converters
+            )
+
+
+URL_NAMES = dict(
+    item
+    for module in URL_MODULES
+    for item in iter_url_names(module.urlpatterns, module.app_name)
+)
+
+
+def fingerprint(sql):
+    sql = re.sub(r"'(?:[^']|'')*'", "?", sql)
+    sql = re.sub(r"\b\d+(\.\d+)?\b", "?", sql)
+    return re.sub(r"\((?:\?, )*\?\)", "(...)", sql)
+
+
+@pytest.fixture
+def count_rows(monkeypatch):
+    """Записывает число полученных строк в `rows` последнего запроса
+    из `connection.queries_log`."""
+
+    def wrap(method):
+        def fetch(self, *args, **kwargs):
+            result = getattr(self.cursor, method)(*args, **kwargs)
+            if self.db.queries_log:
+                query = self.db.queries_log[-1]
+                rows = (result is not None) if method == "fetchone" else len(
+                    result
+                )
+                query["rows"] = query.get("rows", 0) + rows
+            return result
+        return fetch
+
+    for method in ("fetchone", "fetchmany", "fetchall"):
+        monkeypatch.setattr(CursorWrapper, method, wrap(method), raising=False)
+
+
+@pytest.fixture
+def seeded(mixer: Mixer, user, another_user):
+    categories = mixer.cycle(3).blend(
+        "blog.Category", is_published=mixer.sequence(True, True, False)
+    )
+    locations = mixer.cycle(3).blend("blog.Location", is_published=True)
+    now = timezone.now()
+    posts = mixer.cycle(25).blend(
+        "blog.Post",
+        author=mixer.sequence(*[user] * 15, *[another_user] * 10),
+        category=mixer.sequence(*categories),
+        location=mixer.sequence(None, *locations),
+        is_published=mixer.sequence(*[True] * 9, False),
+        pub_date=mixer.sequence(
+            *(now - timedelta(days=day) for day in range(1, 21)),
+            now + timedelta(days=1),
+        ),
+    )
+    post = posts[0]
+    comments = mixer.cycle(30).blend(
+        "blog.Comment",
+        post=post,
+        author=mixer.sequence(user, another_user),
+    )
+    for other_post in posts[1:5]:
+        mixer.cycle(3).blend("blog.Comment", post=other_post)
+    return {
+        "post_id": post.id,
+        "comment_pk": comments[0].id,
+        "username": user.username,
+        "category_slug": post.category.slug,
+        "uidb64": urlsafe_base64_encode(force_bytes(user.pk)),
+    }
+
+
+def test_every_named_url_has_budget():
+    unpinned = sorted(name for name in URL_NAMES if name not in BUDGETS)
+    assert not unpinned, (
+        "Задайте бюджет запросов для новых страниц в `BUDGETS`: "
+        f"{', '.join(unpinned)}"
+    )
+
+
+@pytest.mark.parametrize("client_kind", CLIENTS)
+@pytest.mark.parametrize("name", sorted(URL_NAMES))
+def test_view_query_budget(
+        request, name, client_kind, seeded, count_rows, user):
+    client = {
+        "anonymous": Client(),
+        "author": request.getfixturevalue("user_client"),
+        "other": request.getfixturevalue("another_user_client"),
+    }[client_kind]
+    # Logging in changes last_login, which invalidates earlier tokens.
+    seeded["token"] = default_token_generator.make_token(user)
+    url = reverse(name, kwargs={
+        argument: seeded[argument] for argument in URL_NAMES[name]
+    })
+    max_queries, max_rows = BUDGETS[name][client_kind]
+    with CaptureQueriesContext(connection) as queries:
+        client.get(url)
+    rows = sum(query.get("rows", 0) for query in queries)
+    if len(queries) > max_queries or rows > max_rows:
+        fingerprints = Counter(
+            fingerprint(query["sql"]) for query in queries
+        )
+        pytest.fail(
+            f"`GET {url}` ({client_kind}): {len(queries)} запросов из "
+            f"{max_queries}, {rows} строк из {max_rows}:\n"
+            + "\n".join(
+                f"{count} × {sql}" for sql, count in fingerprints.items()
+            )
+        )